@@ -0,0 +1,172 @@
+"""Load benchmark for the auth endpoints.
+
+Seeds a file-backed SQLite database, drives /api/login, /api/register and /api/refresh
+in-process (ASGI transport) and over a real uvicorn socket, and writes per-route
+throughput, latency percentiles and a bcrypt/JWT/DB time breakdown as JSON. When a
+baseline is given, any route that regresses past the tolerance fails the run.
+
+    python -m benchmarks --users 200 --requests 200 --concurrency 16
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200, help="users to seed before the run")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent client workers")
+    parser.add_argument("--mode", choices=["inprocess", "socket", "both"], default="both")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression, 0.25 == 25%%")
+    parser.add_argument("--update-baseline", action="store_true", help="write results to --baseline instead of comparing")
+    return parser.parse_args(argv)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _run_routes(client, args, breakdown):
+    # Imported lazily: the service reads its configuration from the environment at import time.
+    from benchmarks.loadgen import run_phase
+    from benchmarks.report import summarize
+    from benchmarks.seed import SEED_PASSWORD, seed_email
+
+    register_ids = itertools.count()
+    run_id = int(time.time() * 1000)
+
+    def login(i):
+        return "/api/login", {"email": seed_email(i % args.users), "password": SEED_PASSWORD}
+
+    def register(i):
+        n = next(register_ids)
+        return "/api/register", {"email": f"new{run_id}-{n}@bench.example.com", "password": "Password1", "nickname": f"new_{n}"}
+
+    # Refresh tokens come from real logins so the refresh path sees production-shaped tokens.
+    refresh_tokens = []
+    for i in range(min(args.users, 32)):
+        response = await client.post("/api/login", json={"email": seed_email(i), "password": SEED_PASSWORD})
+        response.raise_for_status()
+        refresh_tokens.append(response.json()["refresh_token"])
+
+    def refresh(i):
+        return "/api/refresh", {"refresh_token": refresh_tokens[i % len(refresh_tokens)]}
+
+    routes = {}
+    for route, factory, expected in (("login", login, 200), ("register", register, 201), ("refresh", refresh, 200)):
+        breakdown.reset()
+        latencies, errors, elapsed = await run_phase(client, factory, args.requests, args.concurrency, expected)
+        routes[route] = summarize(latencies, errors, elapsed)
+        routes[route]["breakdown"] = breakdown.snapshot()
+    return routes
+
+
+async def _inprocess(args, breakdown):
+    import httpx
+
+    from ta_user_svc.app import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return await _run_routes(client, args, breakdown)
+
+
+async def _over_socket(args, breakdown):
+    import httpx
+    import uvicorn
+
+    from ta_user_svc.app import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        await asyncio.sleep(0.05)
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            return await _run_routes(client, args, breakdown)
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+async def run(args) -> dict:
+    from benchmarks.seed import seed_users
+    from benchmarks.timers import Breakdown, install
+    from ta_user_svc.models.base import get_engine
+    from ta_user_svc.services.password_hasher import password_hasher
+
+    engine = get_engine()
+    breakdown = Breakdown()
+    install(breakdown, engine)
+    await seed_users(engine, args.users)
+
+    results = {
+        "config": {"users": args.users, "requests": args.requests, "concurrency": args.concurrency, "cpus": os.cpu_count()},
+        "modes": {},
+    }
+    try:
+        if args.mode in ("inprocess", "both"):
+            results["modes"]["inprocess"] = await _inprocess(args, breakdown)
+            # Pooled connections must not leak across the event loops of the two modes.
+            await engine.dispose()
+        if args.mode in ("socket", "both"):
+            results["modes"]["socket"] = await _over_socket(args, breakdown)
+    finally:
+        await engine.dispose()
+        password_hasher.shutdown()
+    return results
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="ta_user_svc_bench_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    # One client address drives all traffic; throttling it would measure the limiter, not the service.
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    from benchmarks.report import compare, format_table, read_json, write_json
+
+    results = asyncio.run(run(args))
+    print(format_table(results))
+    write_json(args.output, results)
+    print(f"\nresults written to {args.output}")
+
+    if args.baseline and args.update_baseline:
+        write_json(args.baseline, results)
+        print(f"baseline updated at {args.baseline}")
+    elif args.baseline:
+        baseline = read_json(args.baseline)
+        if baseline.get("config") != results["config"]:
+            # Numbers from a different load shape or CPU count are not comparable.
+            print(
+                f"\nBASELINE CONFIG MISMATCH: baseline was recorded with {baseline.get('config')}, "
+                f"this run used {results['config']}. Re-record it on this host with --update-baseline.",
+                file=sys.stderr,
+            )
+            return 2
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nPERFORMANCE REGRESSION (tolerance {args.tolerance:.0%}):", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"no regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
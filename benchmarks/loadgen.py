@@ -0,0 +1,41 @@
+import asyncio
+import itertools
+import time
+from typing import Callable, List, Tuple
+
+import httpx
+
+# A request factory returns (path, json_body) for the i-th request of a phase.
+RequestFactory = Callable[[int], Tuple[str, dict]]
+
+
+async def run_phase(client: httpx.AsyncClient, factory: RequestFactory, total: int, concurrency: int, expected_status: int):
+    """Fires ``total`` POSTs from ``concurrency`` workers and records per-request latency.
+
+    Returns (latencies in seconds of successful requests, error count, elapsed seconds).
+    """
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            path, body = factory(i)
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                ok = response.status_code == expected_status
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
@@ -0,0 +1,74 @@
+import json
+import math
+from typing import Dict, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile; ``samples`` need not be sorted."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    """Reduces per-request latencies (seconds) to the numbers we track per route."""
+    completed = len(latencies)
+    return {
+        "requests": completed + errors,
+        "errors": errors,
+        "rps": round(completed / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Returns a human-readable line for each route/metric that regressed past ``tolerance``.
+
+    Latency regresses when it grows by more than ``tolerance`` (0.2 == 20%) over the baseline;
+    throughput regresses when it drops by more than ``tolerance``.
+    """
+    regressions = []
+    for mode, routes in baseline.get("modes", {}).items():
+        current_routes = results.get("modes", {}).get(mode, {})
+        for route, expected in routes.items():
+            current = current_routes.get(route)
+            if current is None:
+                continue
+            for metric in ("p50_ms", "p95_ms", "p99_ms"):
+                if expected.get(metric) and current[metric] > expected[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{mode} {route} {metric}: {current[metric]:.1f} > baseline {expected[metric]:.1f}"
+                    )
+            if expected.get("rps") and current["rps"] < expected["rps"] * (1 - tolerance):
+                regressions.append(f"{mode} {route} rps: {current['rps']:.1f} < baseline {expected['rps']:.1f}")
+            if current["errors"] > expected.get("errors", 0):
+                regressions.append(f"{mode} {route} errors: {current['errors']} > baseline {expected.get('errors', 0)}")
+    return regressions
+
+
+def write_json(path: str, data: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def read_json(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def format_table(results: dict) -> str:
+    lines = [f"{'mode':<10} {'route':<14} {'reqs':>6} {'err':>4} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}"]
+    for mode, routes in results.get("modes", {}).items():
+        for route, stats in routes.items():
+            lines.append(
+                f"{mode:<10} {route:<14} {stats['requests']:>6} {stats['errors']:>4} {stats['rps']:>9.1f} "
+                f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+            )
+            for name, part in stats.get("breakdown", {}).items():
+                lines.append(f"{'':<25} {name:<8} calls={part['calls']:<6} mean={part['mean_ms']:.3f}ms total={part['total_ms']:.1f}ms")
+    return "\n".join(lines)
@@ -0,0 +1,117 @@
+"""Login throughput vs. uvicorn worker count.
+
+Starts ``main.main`` once per worker count against the same seeded SQLite file, drives
+``/api/login`` over HTTP and reports req/s and p99 per worker count. bcrypt is CPU-bound, so
+throughput should grow roughly linearly until worker count reaches the core count.
+
+    python -m benchmarks.scaling --workers 1,2,4 --requests 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.__main__ import _free_port
+from benchmarks.startup import _env
+
+
+def _default_workers() -> str:
+    counts, n = [], 1
+    while n <= (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    return ",".join(map(str, counts))
+
+
+async def _seed(database_url: str, users: int) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from benchmarks.seed import seed_users
+    from ta_user_svc.models.base import to_async_url
+
+    engine = create_async_engine(to_async_url(database_url))
+    try:
+        await seed_users(engine, users)
+    finally:
+        await engine.dispose()
+
+
+async def _drive(port: int, args) -> dict:
+    import httpx
+
+    from benchmarks.loadgen import run_phase
+    from benchmarks.report import summarize
+    from benchmarks.seed import SEED_PASSWORD, seed_email
+
+    def login(i):
+        return "/api/login", {"email": seed_email(i % args.users), "password": SEED_PASSWORD}
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120) as client:
+        deadline = time.perf_counter() + 60
+        while True:
+            try:
+                if (await client.get("/metrics")).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.perf_counter() > deadline:
+                raise TimeoutError("service did not start")
+            await asyncio.sleep(0.05)
+        # One warm-up round so every worker has its hashing pool and login cache populated.
+        await run_phase(client, login, args.concurrency * 2, args.concurrency, 200)
+        latencies, errors, elapsed = await run_phase(client, login, args.requests, args.concurrency, 200)
+    return summarize(latencies, errors, elapsed)
+
+
+def run_one(workers: int, database_url: str, args) -> dict:
+    port = _free_port()
+    env = _env(
+        WEB_WORKERS=str(workers),
+        SERVICE_PORT=str(port),
+        DATABASE_URL=database_url,
+        # All load comes from one client address.
+        RATE_LIMIT_ENABLED="false",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-c", "from ta_user_svc.main import main; main()"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        return asyncio.run(_drive(port, args))
+    finally:
+        proc.terminate()  # SIGTERM: exercises the graceful drain
+        proc.wait(timeout=60)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.scaling", description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default=_default_workers(), help="comma-separated worker counts")
+    parser.add_argument("--users", type=int, default=50, help="users to seed")
+    parser.add_argument("--requests", type=int, default=200, help="measured logins per worker count")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent client connections")
+    parser.add_argument("--output", help="where to write the JSON results")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="ta_user_svc_scaling_")
+    database_url = f"sqlite:///{os.path.join(workdir, 'scaling.db')}"
+    asyncio.run(_seed(database_url, args.users))
+
+    results = {"cpus": os.cpu_count(), "runs": {}}
+    print(f"{'workers':>8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for workers in (int(n) for n in args.workers.split(",")):
+        stats = run_one(workers, database_url, args)
+        results["runs"][str(workers)] = stats
+        print(f"{workers:>8} {stats['rps']:>9} {stats['p50_ms']:>9} {stats['p99_ms']:>9} {stats['errors']:>7}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
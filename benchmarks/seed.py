@@ -0,0 +1,29 @@
+from sqlalchemy import insert
+
+from ta_user_svc.models.base import Base
+from ta_user_svc.models.user import User
+from ta_user_svc.services.password_hasher import pwd_context
+
+SEED_PASSWORD = "bench-password-1"
+
+
+def seed_email(i: int) -> str:
+    return f"seed{i}@bench.example.com"
+
+
+async def seed_users(engine, count: int) -> None:
+    """Creates the schema and inserts ``count`` approved users sharing one hash.
+
+    The hash uses the service's current policy, so logins measure a plain verify and never
+    trigger a background rehash.
+    """
+    passhash = pwd_context.hash(SEED_PASSWORD)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        rows = [
+            {"email": seed_email(i), "passhash": passhash, "nickname": f"seed{i}", "role": "user", "approved": True}
+            for i in range(count)
+        ]
+        for start in range(0, len(rows), 1000):
+            await conn.execute(insert(User), rows[start:start + 1000])
@@ -0,0 +1,130 @@
+"""Registration and login throughput on a SQLite file: default engine vs. tuned SQLite mode.
+
+Runs the same mixed workload in-process against two freshly seeded database files: the
+default pooled engine with one transaction per registration, and tuned mode (WAL and
+pragmas, a pooled reader, and a single writer that group-commits registrations). Password
+hashes are precomputed, so the numbers measure the database path only.
+
+    python -m benchmarks.sqlite_mode --operations 4000 --concurrency 64 --write-ratio 0.3
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+async def _seed(database_url: str, users: int) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from benchmarks.seed import seed_users
+    from ta_user_svc.models.base import to_async_url
+
+    engine = create_async_engine(to_async_url(database_url))
+    try:
+        await seed_users(engine, users)
+    finally:
+        await engine.dispose()
+
+
+async def _workload(read_factory, insert, args) -> dict:
+    from benchmarks.report import summarize
+    from benchmarks.seed import seed_email
+    from ta_user_svc.models.queries import get_login_record
+
+    write_every = round(1 / args.write_ratio) if args.write_ratio > 0 else 0
+    latencies, errors = {"register": [], "login": []}, {"register": 0, "login": 0}
+    next_op = iter(range(args.operations))
+
+    async def worker():
+        for i in next_op:
+            kind = "register" if write_every and i % write_every == 0 else "login"
+            started = time.perf_counter()
+            try:
+                if kind == "register":
+                    row = {"email": f"new{i}@bench.example.com", "passhash": "x", "nickname": f"new{i}", "role": "user", "approved": False}
+                    await insert(row)
+                else:
+                    async with read_factory() as db:
+                        await get_login_record(db, seed_email(i % args.users))
+            except Exception:
+                errors[kind] += 1
+                continue
+            latencies[kind].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    return {kind: summarize(latencies[kind], errors[kind], elapsed) for kind in latencies}
+
+
+async def run_default(database_url: str, args) -> dict:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from ta_user_svc.models.base import engine_options, to_async_url
+    from ta_user_svc.models.queries import insert_user_if_absent
+
+    engine = create_async_engine(to_async_url(database_url), **engine_options(database_url))
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def insert(row):
+        async with factory() as db:
+            await insert_user_if_absent(db, row)
+
+    try:
+        return await _workload(factory, insert, args)
+    finally:
+        await engine.dispose()
+
+
+async def run_tuned(database_url: str, args) -> dict:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    from ta_user_svc.models.base import sqlite_engine
+    from ta_user_svc.services.user_writer import GroupCommitWriter
+
+    writer_engine, reader_engine = sqlite_engine(database_url, writer=True), sqlite_engine(database_url, writer=False)
+    writer = GroupCommitWriter(args.write_batch)
+    task = asyncio.create_task(writer.run(async_sessionmaker(bind=writer_engine, expire_on_commit=False)))
+    await asyncio.sleep(0)
+    try:
+        return await _workload(async_sessionmaker(bind=reader_engine, expire_on_commit=False), writer.insert_user, args)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await writer_engine.dispose()
+        await reader_engine.dispose()
+
+
+def main(argv=None) -> int:
+    from ta_user_svc.config import SQLITE_WRITE_BATCH
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sqlite_mode", description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000, help="users to seed")
+    parser.add_argument("--operations", type=int, default=4000, help="measured operations per mode")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent in-flight operations")
+    parser.add_argument("--write-ratio", type=float, default=0.3, help="share of operations that register")
+    parser.add_argument("--write-batch", type=int, default=SQLITE_WRITE_BATCH, help="largest group commit in tuned mode")
+    parser.add_argument("--output", help="where to write the JSON results")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="ta_user_svc_sqlite_")
+    results = {"runs": {}}
+    print(f"{'mode':>8} {'operation':>9} {'ops/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for mode, run in (("default", run_default), ("tuned", run_tuned)):
+        database_url = f"sqlite:///{os.path.join(workdir, f'{mode}.db')}"
+        asyncio.run(_seed(database_url, args.users))
+        stats = asyncio.run(run(database_url, args))
+        results["runs"][mode] = stats
+        for operation, s in stats.items():
+            print(f"{mode:>8} {operation:>9} {s['rps']:>9} {s['p50_ms']:>9} {s['p99_ms']:>9} {s['errors']:>7}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
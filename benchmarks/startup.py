@@ -0,0 +1,107 @@
+"""Startup-time benchmark.
+
+Reports ``python -X importtime`` for building the app with ``create_app()`` (total and the
+heaviest modules) and the time from launching ``main.main`` until the first request is answered.
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.__main__ import _free_port
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def parse_importtime(stderr: str) -> tuple[dict, int]:
+    """Returns ``({module: (self_us, cumulative_us)}, total_us)`` from ``-X importtime`` output.
+
+    The total sums the top-level imports, so nested modules are not counted twice.
+    """
+    modules = {}
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+        if not name[1:].startswith(" "):
+            total += int(cumulative_us)
+    return modules, total
+
+
+def _env(**extra) -> dict:
+    env = dict(os.environ, **extra)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC, env.get("PYTHONPATH")]))
+    return env
+
+
+def measure_import(top: int = 10) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from ta_user_svc.app import create_app; create_app()"],
+        env=_env(), capture_output=True, text=True, check=True,
+    )
+    modules, total = parse_importtime(proc.stderr)
+    heaviest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return {
+        "total_ms": round(total / 1000, 3),
+        "heaviest_self_ms": {name: round(self_us / 1000, 3) for name, (self_us, _) in heaviest},
+    }
+
+
+def measure_first_request(timeout: float = 60.0) -> float:
+    """Seconds from spawning ``main.main`` until GET /metrics answers."""
+    port = _free_port()
+    workdir = tempfile.mkdtemp(prefix="ta_user_svc_startup_")
+    env = _env(SERVICE_PORT=str(port), DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'startup.db')}")
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", "from ta_user_svc.main import main; main()"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise TimeoutError(f"service did not answer within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="repetitions; medians are reported")
+    parser.add_argument("--output", help="where to write the JSON results")
+    args = parser.parse_args(argv)
+
+    imports = [measure_import() for _ in range(args.runs)]
+    first_request = [measure_first_request() for _ in range(args.runs)]
+    results = {
+        "runs": args.runs,
+        "import_ms": statistics.median(run["total_ms"] for run in imports),
+        "heaviest_self_ms": imports[-1]["heaviest_self_ms"],
+        "first_request_ms": round(statistics.median(first_request) * 1000, 3),
+    }
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import time
+from collections import defaultdict
+from functools import wraps
+
+import jwt
+from sqlalchemy import event
+
+
+class Breakdown:
+    """Accumulates wall time spent in bcrypt, JWT and SQL while a benchmark phase runs."""
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.totals[name] += seconds
+        self.calls[name] += 1
+
+    def reset(self) -> None:
+        self.totals.clear()
+        self.calls.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            name: {
+                "calls": self.calls[name],
+                "total_ms": round(self.totals[name] * 1000, 3),
+                "mean_ms": round(self.totals[name] * 1000 / self.calls[name], 3) if self.calls[name] else 0.0,
+            }
+            for name in sorted(self.totals)
+        }
+
+
+def _timed(breakdown: Breakdown, name: str, fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            breakdown.add(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def install(breakdown: Breakdown, engine) -> None:
+    """Hooks the hashing, JWT and SQL hot paths so their cost lands in ``breakdown``.
+
+    bcrypt time is measured inside the hashing worker; time spent waiting for a free
+    worker is reported separately as ``hash_queue``.
+    """
+    from ta_user_svc.services.password_hasher import password_hasher
+
+    previous = password_hasher.observer
+
+    def observe_hash(operation, compute, queued):
+        breakdown.add("bcrypt", compute)
+        breakdown.add("hash_queue", queued)
+        if previous is not None:
+            previous(operation, compute, queued)
+
+    password_hasher.observer = observe_hash
+    jwt.encode = _timed(breakdown, "jwt", jwt.encode)
+    jwt.decode = _timed(breakdown, "jwt", jwt.decode)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("bench_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        breakdown.add("db", time.perf_counter() - conn.info["bench_query_start"].pop())
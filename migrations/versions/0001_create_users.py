@@ -0,0 +1,37 @@
+"""create users table
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The schema as it was built by create_all before migrations existed.
+    op.create_table(
+        "users",
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("passhash", sa.String(), nullable=False),
+        sa.Column("nickname", sa.String(), nullable=False),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("approved", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("email"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,48 @@
+"""normalized email and login/approval indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Backfill before NOT NULL and the unique index. If two existing accounts differ only in
+    # case the unique index fails; merge or rename them first.
+    op.add_column("users", sa.Column("email_normalized", sa.String(), nullable=True))
+    op.execute("UPDATE users SET email_normalized = lower(trim(email))")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.alter_column("email_normalized", existing_type=sa.String(), nullable=False)
+        # The primary key already indexes email.
+        batch_op.drop_index("ix_users_email")
+
+    op.create_index("ux_users_email_lower", "users", [sa.text("lower(trim(email))")], unique=True)
+    op.create_index("ix_users_login", "users", ["email_normalized", "email", "passhash", "approved", "nickname"])
+    op.create_index(
+        "ix_users_pending",
+        "users",
+        ["email"],
+        sqlite_where=sa.text("approved = 0"),
+        postgresql_where=sa.text("NOT approved"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_pending", table_name="users")
+    op.drop_index("ix_users_login", table_name="users")
+    op.drop_index("ux_users_email_lower", table_name="users")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.create_index("ix_users_email", ["email"], unique=False)
+        batch_op.drop_column("email_normalized")
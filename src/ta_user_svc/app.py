@@ -1,12 +1,88 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from ta_user_svc.routers.user_registration import router as user_registration_router
-from ta_user_svc.routers.user_login import router as user_login_router
-from ta_user_svc.routers.user_logout import router as user_logout_router
-from ta_user_svc.routers.user_refresh import router as user_refresh_router  # newly added
 
-app = FastAPI(debug=True)
+from ta_user_svc.config import Settings
+from ta_user_svc.models.base import SessionLocal, configure_engine, dispose_engine, get_engine, on_engine_created, read_router, sqlite_mode
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """Builds the application.
+
+    Routers and services are imported here rather than at module import, and the engine,
+    hashing pool and crypto backends are brought up in the lifespan, so importing this module
+    stays cheap.
+    """
+    settings = settings or Settings()
+
+    from ta_user_svc.routers.admin import router as admin_router
+    from ta_user_svc.routers.debug import router as debug_router
+    from ta_user_svc.routers.jwks import router as jwks_router
+    from ta_user_svc.routers.metrics import router as metrics_router
+    from ta_user_svc.routers.token_introspection import router as token_introspection_router
+    from ta_user_svc.routers.user_login import router as user_login_router
+    from ta_user_svc.routers.user_logout import router as user_logout_router
+    from ta_user_svc.routers.user_refresh import router as user_refresh_router
+    from ta_user_svc.routers.user_registration import router as user_registration_router
+    from ta_user_svc.services import metrics, profiling, tokens
+    from ta_user_svc.services.audit import audit_log
+    from ta_user_svc.services.fast_json import JSONResponseClass
+    from ta_user_svc.services.password_hasher import password_hasher
+    from ta_user_svc.services.rate_limiter import rate_limiter
+    from ta_user_svc.services.revocation import revocation_store
+    from ta_user_svc.services.user_writer import user_writer
+
+    configure_engine(settings.database_url, settings.replica_urls, settings.sqlite_tuned)
+    on_engine_created(metrics.instrument_engine)
+    on_engine_created(profiling.instrument_engine)
+    if password_hasher.observer is None:  # keep an observer installed by tooling such as the benchmarks
+        password_hasher.observer = metrics.observe_hash
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        get_engine()
+        if settings.warm_up:
+            await password_hasher.warm_up()
+            tokens.warm_up()
+        revocation_store.load()
+        sweeper = asyncio.create_task(rate_limiter.sweep_forever(settings.rate_limit_sweep_seconds))
+        audit_flusher = asyncio.create_task(audit_log.run(SessionLocal))
+        replica_checker = asyncio.create_task(read_router.check_forever(settings.replica_health_check_seconds))
+        # Tuned SQLite has a single writer connection; registrations share its commits in groups.
+        writer = asyncio.create_task(user_writer.run(SessionLocal)) if sqlite_mode() else None
+        yield
+        sweeper.cancel()
+        replica_checker.cancel()
+        # Cancelling the flusher drains queued audit events; wait for it before the engine goes away.
+        audit_flusher.cancel()
+        await asyncio.gather(audit_flusher, return_exceptions=True)
+        if writer is not None:
+            writer.cancel()
+            await asyncio.gather(writer, return_exceptions=True)
+        password_hasher.shutdown()
+        await dispose_engine()
+
+    app = FastAPI(debug=settings.debug, lifespan=lifespan, default_response_class=JSONResponseClass)
+    app.add_middleware(profiling.ProfilingMiddleware, enabled=settings.profiling_enabled)
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    app.include_router(user_registration_router, prefix="/api")
+    app.include_router(user_login_router, prefix="/api")
+    app.include_router(user_logout_router, prefix="/api")
+    app.include_router(user_refresh_router, prefix="/api")  # token refresh endpoint
+    app.include_router(token_introspection_router, prefix="/api")  # batch token checks for gateways
+    app.include_router(admin_router, prefix="/api/admin")  # approval queue, admin role only
+    app.include_router(metrics_router)  # Prometheus scrape endpoint, outside /api
+    app.include_router(jwks_router)  # public keys for local token verification
+    if settings.profiling_enabled:
+        app.include_router(debug_router)  # aggregated profiling view
+    return app
+
 
-app.include_router(user_registration_router, prefix="/api")
-app.include_router(user_login_router, prefix="/api")
-app.include_router(user_logout_router, prefix="/api")
-app.include_router(user_refresh_router, prefix="/api")  # token refresh endpoint
+def __getattr__(name: str):
+    # ``ta_user_svc.app:app`` keeps working for uvicorn and existing imports; built on first access.
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,77 @@
+"""Picks the password-hashing cost that fits a verify-latency budget on this host.
+
+Times a verify at increasing cost for the chosen scheme and prints the settings for the most
+expensive cost whose median verify stays within the target, ready to paste into the environment:
+
+    ta_user_svc_calibrate --target-ms 250
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from ta_user_svc.services.password_hasher import build_context
+
+SAMPLE_PASSWORD = "calibration-password-1"
+
+
+def time_verify(context, samples: int) -> float:
+    """Median seconds for one verify under ``context``'s default scheme and cost."""
+    passhash = context.hash(SAMPLE_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.verify(SAMPLE_PASSWORD, passhash)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt(scheme: str, target: float, samples: int, max_rounds: int = 16) -> tuple[dict, float]:
+    # Each extra round doubles the cost, so stop at the first one over budget.
+    best, best_time = {"BCRYPT_ROUNDS": 4}, 0.0
+    for rounds in range(4, max_rounds + 1):
+        elapsed = time_verify(build_context(scheme, bcrypt_rounds=rounds), samples)
+        if elapsed > target:
+            break
+        best, best_time = {"BCRYPT_ROUNDS": rounds}, elapsed
+    return best, best_time
+
+
+def calibrate_argon2(target: float, samples: int, memory_cost: int, max_time_cost: int = 20) -> tuple[dict, float]:
+    # Memory is fixed (it sets the attacker's per-guess RAM); time_cost scales linearly.
+    best, best_time = {"ARGON2_TIME_COST": 1, "ARGON2_MEMORY_COST": memory_cost}, 0.0
+    for time_cost in range(1, max_time_cost + 1):
+        context = build_context("argon2", argon2_time_cost=time_cost, argon2_memory_cost=memory_cost)
+        elapsed = time_verify(context, samples)
+        if elapsed > target:
+            break
+        best, best_time = {"ARGON2_TIME_COST": time_cost, "ARGON2_MEMORY_COST": memory_cost}, elapsed
+    return best, best_time
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="ta_user_svc_calibrate", description=__doc__.splitlines()[0])
+    parser.add_argument("--scheme", default="bcrypt_sha256", choices=["bcrypt_sha256", "bcrypt", "argon2"])
+    parser.add_argument("--target-ms", type=float, default=250.0, help="verify latency budget per login")
+    parser.add_argument("--samples", type=int, default=3, help="verifies timed per candidate cost")
+    parser.add_argument("--argon2-memory-kib", type=int, default=65536, help="argon2 memory cost in KiB")
+    args = parser.parse_args(argv)
+
+    target = args.target_ms / 1000
+    try:
+        if args.scheme == "argon2":
+            settings, elapsed = calibrate_argon2(target, args.samples, args.argon2_memory_kib)
+        else:
+            settings, elapsed = calibrate_bcrypt(args.scheme, target, args.samples)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"# median verify {elapsed * 1000:.1f} ms (target {args.target_ms:.0f} ms)")
+    print(f"PASSWORD_SCHEME={args.scheme}")
+    for name, value in settings.items():
+        print(f"{name}={value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,149 @@
 import os
+from dataclasses import dataclass
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///:memory:")
-SERVICE_PORT = os.getenv("SERVICE_PORT", 8000)
\ No newline at end of file
+SERVICE_PORT = os.getenv("SERVICE_PORT", 8000)
+
+# Serving: uvicorn worker processes, event loop / HTTP parser ("auto" prefers uvloop/httptools when
+# installed), keep-alive seconds, listen backlog, max concurrent connections per worker (0 = unlimited)
+# and seconds to drain in-flight requests after SIGTERM.
+SERVICE_HOST = os.getenv("SERVICE_HOST", "0.0.0.0")
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", os.cpu_count() or 1))
+LOOP_IMPL = os.getenv("LOOP_IMPL", "auto")
+HTTP_IMPL = os.getenv("HTTP_IMPL", "auto")
+KEEP_ALIVE_TIMEOUT = int(os.getenv("KEEP_ALIVE_TIMEOUT", 5))
+LISTEN_BACKLOG = int(os.getenv("LISTEN_BACKLOG", 2048))
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", 0))
+GRACEFUL_SHUTDOWN_TIMEOUT = int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", 30))
+
+# Password hashing executor: 0 workers runs bcrypt on the default thread executor instead of a process pool.
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", os.cpu_count() or 1))
+# Maximum number of hash/verify calls allowed in flight before new ones are rejected.
+HASH_QUEUE_MAX = int(os.getenv("HASH_QUEUE_MAX", max(HASH_POOL_WORKERS, 1) * 16))
+
+# Password hashing policy: scheme for new hashes (bcrypt_sha256, bcrypt, or argon2 when argon2-cffi is
+# installed) and its cost. Pick costs with `ta_user_svc_calibrate`; older hashes are upgraded on login.
+PASSWORD_SCHEME = os.getenv("PASSWORD_SCHEME", "bcrypt_sha256")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 3))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 65536))
+
+# Read replicas: comma-separated async-capable URLs that serve read-only lookups (login) in turn,
+# seconds between replica health checks, seconds a check may take, and seconds a client's reads
+# stay on the primary after it writes (read-your-writes).
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_HEALTH_CHECK_SECONDS = float(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", 5))
+REPLICA_CHECK_TIMEOUT = float(os.getenv("REPLICA_CHECK_TIMEOUT", 1))
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+# File-backed SQLite production mode: one dedicated writer connection (registrations are
+# group-committed through it, up to SQLITE_WRITE_BATCH per transaction) plus the pooled readers,
+# with the pragmas applied to every connection. cache_size is in KiB when negative.
+SQLITE_TUNED = os.getenv("SQLITE_TUNED", "true").lower() in ("1", "true", "yes")
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -64 * 1024))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_STATEMENT_CACHE = int(os.getenv("SQLITE_STATEMENT_CACHE", 256))
+SQLITE_WRITE_BATCH = int(os.getenv("SQLITE_WRITE_BATCH", 64))
+
+# Database connection pool tuning (ignored for in-memory SQLite).
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+# JWT signing and lifetimes, shared by the login and refresh endpoints.
+JWT_SECRET = os.getenv("JWT_SECRET", "mysecret")
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "10"))
+REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", "1440"))
+# Verified refresh-token cache: max entries and max seconds an entry is trusted (never past the token's exp).
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", 60))
+
+# Bulk registration: max users per JSON request and users per batch for the NDJSON stream.
+BULK_REGISTRATION_MAX = int(os.getenv("BULK_REGISTRATION_MAX", 5000))
+BULK_STREAM_BATCH_SIZE = int(os.getenv("BULK_STREAM_BATCH_SIZE", 500))
+
+# Admin approval queue: default and max users per page, max emails per bulk approve/reject request.
+ADMIN_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE", 100))
+ADMIN_PAGE_SIZE_MAX = int(os.getenv("ADMIN_PAGE_SIZE_MAX", 1000))
+ADMIN_BULK_MAX = int(os.getenv("ADMIN_BULK_MAX", 10000))
+# Users export: rows fetched per server-side cursor batch (each batch is one chunk of the stream).
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+# Audit log: master switch, max events buffered in memory (further events are dropped and counted),
+# events per INSERT batch, and max seconds an event waits before being written.
+AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "true").lower() in ("1", "true", "yes")
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", 50000))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 500))
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", 1.0))
+
+# Token introspection: max tokens per request, and seconds a user lookup waits so concurrent
+# requests can share its IN query.
+INTROSPECT_MAX_TOKENS = int(os.getenv("INTROSPECT_MAX_TOKENS", 1000))
+INTROSPECT_BATCH_WINDOW = float(os.getenv("INTROSPECT_BATCH_WINDOW", 0.002))
+
+# Login record cache: max entries, seconds a known account is trusted, seconds an unknown email stays cached.
+LOGIN_CACHE_SIZE = int(os.getenv("LOGIN_CACHE_SIZE", 50000))
+LOGIN_CACHE_TTL = int(os.getenv("LOGIN_CACHE_TTL", 300))
+LOGIN_CACHE_NEGATIVE_TTL = int(os.getenv("LOGIN_CACHE_NEGATIVE_TTL", 30))
+
+# Token revocation: eviction bucket width in seconds and optional SQLite file that persists revocations.
+REVOCATION_BUCKET_SECONDS = int(os.getenv("REVOCATION_BUCKET_SECONDS", 60))
+REVOCATION_DB_PATH = os.getenv("REVOCATION_DB_PATH", "")
+
+# Rate limiting: token buckets as (refills per second, burst), lock-stripe count, idle sweep interval,
+# and an optional SQLite file that lets several workers share the same buckets.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+LOGIN_IP_RATE = float(os.getenv("LOGIN_IP_RATE", 5))
+LOGIN_IP_BURST = int(os.getenv("LOGIN_IP_BURST", 30))
+LOGIN_EMAIL_RATE = float(os.getenv("LOGIN_EMAIL_RATE", 0.2))
+LOGIN_EMAIL_BURST = int(os.getenv("LOGIN_EMAIL_BURST", 10))
+REFRESH_IP_RATE = float(os.getenv("REFRESH_IP_RATE", 20))
+REFRESH_IP_BURST = int(os.getenv("REFRESH_IP_BURST", 100))
+RATE_LIMIT_SHARDS = int(os.getenv("RATE_LIMIT_SHARDS", 64))
+RATE_LIMIT_SWEEP_SECONDS = int(os.getenv("RATE_LIMIT_SWEEP_SECONDS", 60))
+RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", "")
+
+# Opt-in request profiling: master switch, fraction of requests profiled without an X-Profile header,
+# where .prof files go and how many are kept, statements per request before a warning, stacks per route.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0.0))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 200))
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", 10))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", 10))
+
+# Application factory defaults: FastAPI debug mode and whether startup pre-loads the crypto backends.
+DEBUG = os.getenv("DEBUG", "true").lower() in ("1", "true", "yes")
+WARM_UP = os.getenv("WARM_UP", "true").lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Settings ``create_app`` builds an application from; defaults come from the environment."""
+
+    database_url: str = DATABASE_URL
+    replica_urls: tuple = tuple(DATABASE_REPLICA_URLS)
+    replica_health_check_seconds: float = REPLICA_HEALTH_CHECK_SECONDS
+    sqlite_tuned: bool = SQLITE_TUNED
+    debug: bool = DEBUG
+    warm_up: bool = WARM_UP
+    profiling_enabled: bool = PROFILING_ENABLED
+    rate_limit_sweep_seconds: int = RATE_LIMIT_SWEEP_SECONDS
+
+# JWT signing: HS256 (shared JWT_SECRET), EdDSA or ES256. Asymmetric keys are <kid>.pem files in
+# JWT_KEYS_DIR (create with `ta_user_svc_keygen`); JWT_ACTIVE_KID signs, every key there verifies
+# and is published at /.well-known/jwks.json. JWT_ACCEPT_HS256 keeps kid-less HS256 tokens valid
+# while migrating off the shared secret. JWKS_MAX_AGE is the JWKS cache lifetime in seconds.
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR", "")
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID", "")
+JWT_ACCEPT_HS256 = os.getenv("JWT_ACCEPT_HS256", "true").lower() in ("1", "true", "yes")
+JWKS_MAX_AGE = int(os.getenv("JWKS_MAX_AGE", 300))
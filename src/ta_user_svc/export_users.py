@@ -0,0 +1,50 @@
+"""Streams the users table to a file or stdout as NDJSON or CSV, in constant memory.
+
+Reads DATABASE_URL like the service does; add --include-passhash for a restorable backup:
+
+    ta_user_svc_export --format csv --gzip --approved true -o users.csv.gz
+"""
+import argparse
+import asyncio
+import sys
+
+from ta_user_svc.config import EXPORT_BATCH_SIZE
+from ta_user_svc.models.base import SessionLocal, dispose_engine, get_engine
+from ta_user_svc.models.queries import stream_users
+from ta_user_svc.services.export import BACKUP_COLUMNS, EXPORT_COLUMNS, FORMATS, export_chunks
+
+
+async def export(out, fmt: str, compress: bool, columns: list[str], role=None, approved=None, batch_size: int = EXPORT_BATCH_SIZE) -> None:
+    get_engine()
+    try:
+        async with SessionLocal() as db:
+            async for chunk in export_chunks(stream_users(db, columns, role, approved, batch_size), columns, fmt, compress):
+                out.write(chunk)
+    finally:
+        await dispose_engine()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="ta_user_svc_export", description=__doc__.splitlines()[0])
+    parser.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+    parser.add_argument("--gzip", action="store_true", help="gzip the output")
+    parser.add_argument("--role", help="only users with this role")
+    parser.add_argument("--approved", choices=["true", "false"], help="only approved or only pending users")
+    parser.add_argument("--include-passhash", action="store_true", help="add the password hash column")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="rows per cursor batch")
+    parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    columns = BACKUP_COLUMNS if args.include_passhash else EXPORT_COLUMNS
+    approved = None if args.approved is None else args.approved == "true"
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        asyncio.run(export(out, args.format, args.gzip, columns, args.role, approved, args.batch_size))
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
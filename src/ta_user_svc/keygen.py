@@ -0,0 +1,52 @@
+"""Creates a JWT signing key for JWT_KEYS_DIR.
+
+Writes ``<kid>.pem`` (private key, mode 0600) and prints the settings that make it the active key:
+
+    ta_user_svc_keygen --algorithm EdDSA --dir keys
+"""
+import argparse
+import os
+import sys
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+
+def generate_key(algorithm: str):
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    return ec.generate_private_key(ec.SECP256R1())
+
+
+def write_key(directory: str, kid: str, key) -> str:
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{kid}.pem")
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(pem)
+    return path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="ta_user_svc_keygen", description=__doc__.splitlines()[0])
+    parser.add_argument("--algorithm", choices=["EdDSA", "ES256"], default="EdDSA")
+    parser.add_argument("--dir", default="keys", help="JWT_KEYS_DIR to write into")
+    parser.add_argument("--kid", default=time.strftime("%Y%m%d%H%M%S"), help="key id (default: timestamp)")
+    args = parser.parse_args(argv)
+
+    try:
+        path = write_key(args.dir, args.kid, generate_key(args.algorithm))
+    except FileExistsError:
+        print(f"{args.dir}/{args.kid}.pem already exists", file=sys.stderr)
+        return 1
+    print(f"# wrote {path}; publish it (restart) before making it active")
+    print(f"JWT_ALGORITHM={args.algorithm}")
+    print(f"JWT_KEYS_DIR={args.dir}")
+    print(f"JWT_ACTIVE_KID={args.kid}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
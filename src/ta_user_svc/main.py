@@ -1,20 +1,68 @@
+import importlib.util
 import logging
+import os
 
 import uvicorn
-from ta_user_svc.app import app
-from ta_user_svc.config import SERVICE_PORT
+from ta_user_svc.config import (
+    GRACEFUL_SHUTDOWN_TIMEOUT,
+    HTTP_IMPL,
+    KEEP_ALIVE_TIMEOUT,
+    LIMIT_CONCURRENCY,
+    LISTEN_BACKLOG,
+    LOOP_IMPL,
+    SERVICE_HOST,
+    SERVICE_PORT,
+    WEB_WORKERS,
+)
 
 
 # Set up logging for the application
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Implementation -> module it needs; anything else falls back to the pure-Python default.
+OPTIONAL_IMPLS = {"uvloop": "uvloop", "httptools": "httptools"}
+
+
+def select_impl(requested: str, fallback: str) -> str:
+    """Returns ``requested`` if its module is importable, otherwise ``fallback``.
+
+    ``auto`` is passed through: uvicorn already prefers uvloop/httptools when installed.
+    """
+    module = OPTIONAL_IMPLS.get(requested)
+    if module is None or importlib.util.find_spec(module) is not None:
+        return requested
+    logger.warning(f"{requested} is not installed; falling back to {fallback}")
+    return fallback
+
+
+def hash_workers_per_process(web_workers: int) -> int:
+    # bcrypt is CPU-bound: share the cores between web workers instead of giving each a full pool.
+    return max(1, (os.cpu_count() or 1) // max(web_workers, 1))
+
 
 def main():
     service_port = int(SERVICE_PORT)
-    uvicorn.run(app, host="0.0.0.0", port=service_port)
+    workers = max(WEB_WORKERS, 1)
+    # Worker processes are spawned fresh and read this when ta_user_svc.config is imported.
+    os.environ.setdefault("HASH_POOL_WORKERS", str(hash_workers_per_process(workers)))
+    uvicorn.run(
+        # Each worker builds its own app, engine and hashing pool; nothing is inherited.
+        "ta_user_svc.app:create_app",
+        factory=True,
+        host=SERVICE_HOST,
+        port=service_port,
+        workers=workers,
+        loop=select_impl(LOOP_IMPL, "asyncio"),
+        http=select_impl(HTTP_IMPL, "h11"),
+        timeout_keep_alive=KEEP_ALIVE_TIMEOUT,
+        backlog=LISTEN_BACKLOG,
+        limit_concurrency=LIMIT_CONCURRENCY or None,
+        # On SIGTERM uvicorn stops accepting and waits this long for in-flight requests.
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT,
+    )
 
 
 if __name__ == "__main__":
     # Entry point for the application
-    main()
\ No newline at end of file
+    main()
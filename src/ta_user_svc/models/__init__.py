@@ -1 +1,3 @@
-from .base import Base, get_db
\ No newline at end of file
+from .base import Base, get_db
+from .audit import AuditEvent
+from .user import User
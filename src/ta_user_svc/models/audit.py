@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from ta_user_svc.models.base import Base
+
+
+class AuditEvent(Base):
+    """One login attempt or registration, written in batches by ``services.audit.AuditLog``."""
+
+    __tablename__ = "audit_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    occurred_at = Column(DateTime, nullable=False)  # UTC
+    event = Column(String, nullable=False)
+    email = Column(String, nullable=True)  # normalized
+    client_ip = Column(String, nullable=True)
+    detail = Column(String, nullable=True)
+
+    __table_args__ = (
+        # Security review reads one account's history, newest first.
+        Index("ix_audit_events_email_occurred_at", "email", "occurred_at"),
+    )
@@ -1,19 +1,307 @@
-from sqlalchemy import Column, PrimaryKeyConstraint, String
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import scoped_session, sessionmaker, Session
+import asyncio
+import itertools
+import logging
+import os
+import time
+from typing import AsyncIterator, Callable, Optional
 
-from ta_user_svc.config import DATABASE_URL
+from fastapi import Depends, Request
+from sqlalchemy import event, make_url, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from ta_user_svc.config import (
+    DATABASE_REPLICA_URLS,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    READ_YOUR_WRITES_SECONDS,
+    REPLICA_CHECK_TIMEOUT,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE,
+    SQLITE_JOURNAL_MODE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_STATEMENT_CACHE,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_TUNED,
+)
 
 Base = declarative_base()
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+# aiosqlite is the only async driver shipped as a dependency, so only SQLite URLs are upgraded
+# automatically; other databases must name an installed async driver (e.g. postgresql+asyncpg://).
+SQLITE_ASYNC_DRIVER = "sqlite+aiosqlite"
+
+
+def to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    if parsed.get_dialect().is_async:
+        return url
+    if parsed.get_backend_name() == "sqlite":
+        return parsed.set(drivername=SQLITE_ASYNC_DRIVER).render_as_string(hide_password=False)
+    raise ValueError(
+        f"DATABASE_URL uses the synchronous driver '{parsed.drivername}'; "
+        f"name an async driver instead (e.g. postgresql+asyncpg://) and install it"
+    )
+
+
+def engine_options(url: str) -> dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite uses a single static connection; pool sizing does not apply.
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+def is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+SQLITE_PRAGMAS = (
+    f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}",
+    f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}",
+    f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+    f"PRAGMA cache_size={SQLITE_CACHE_SIZE}",
+    f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+)
+
+
+def apply_sqlite_pragmas(engine: AsyncEngine) -> None:
+    """Runs ``SQLITE_PRAGMAS`` on every new connection of ``engine``.
+
+    WAL lets readers run alongside the writer, and with synchronous=NORMAL a commit no longer
+    fsyncs (only checkpoints do). busy_timeout makes writers from other worker processes wait
+    for the lock instead of failing with "database is locked".
+    """
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def sqlite_engine(url: str, writer: bool) -> AsyncEngine:
+    """The single-connection writer engine, or the pooled reader engine, for a SQLite file."""
+    options = {"pool_size": 1, "max_overflow": 0} if writer else engine_options(url)
+    # cached_statements sizes the driver's per-connection prepared-statement cache.
+    engine = create_async_engine(to_async_url(url), connect_args={"cached_statements": SQLITE_STATEMENT_CACHE}, **options)
+    apply_sqlite_pragmas(engine)
+    return engine
+
+
+class ReadRouter:
+    """Chooses where a read-only session goes: a healthy replica in turn, else the primary.
+
+    Replicas are marked down by the periodic health check or when a checkout fails, and back up
+    by the health check. A client that committed a write is pinned to the primary for
+    ``pin_seconds`` so it reads its own writes despite replication lag. Pins are per process.
+    """
+
+    def __init__(self, pin_seconds: float, max_pins: int = 10000):
+        self.pin_seconds = pin_seconds
+        self.max_pins = max_pins
+        self.engines: list[AsyncEngine] = []
+        self.healthy: list[bool] = []
+        self.consistent = False
+        self._turn = itertools.count()
+        self._pins: dict[str, float] = {}
+
+    def set_engines(self, engines: list[AsyncEngine], consistent: bool = False) -> None:
+        """``consistent`` engines read the primary's own storage, so writers need no pinning."""
+        self.engines = engines
+        self.consistent = consistent
+        self.healthy = [True] * len(engines)
+
+    def pick(self) -> Optional[AsyncEngine]:
+        start = next(self._turn)
+        for i in range(len(self.engines)):
+            index = (start + i) % len(self.engines)
+            if self.healthy[index]:
+                return self.engines[index]
+        return None
+
+    def mark(self, engine: AsyncEngine, healthy: bool) -> None:
+        index = self.engines.index(engine)
+        if self.healthy[index] != healthy:
+            logging.warning("replica %s is %s", engine.url.render_as_string(), "up" if healthy else "down")
+        self.healthy[index] = healthy
+
+    def pin(self, key: Optional[str]) -> None:
+        if key is None or not self.engines or self.consistent:
+            return
+        now = time.monotonic()
+        if len(self._pins) >= self.max_pins:
+            self._pins = {k: until for k, until in self._pins.items() if until > now}
+        self._pins[key] = now + self.pin_seconds
+
+    def pinned(self, key: Optional[str]) -> bool:
+        until = self._pins.get(key)
+        if until is None:
+            return False
+        if until > time.monotonic():
+            return True
+        self._pins.pop(key, None)
+        return False
+
+    async def check(self, timeout: float) -> None:
+        for engine in list(self.engines):
+            try:
+                async with asyncio.timeout(timeout):
+                    async with engine.connect() as conn:
+                        await conn.execute(text("SELECT 1"))
+                healthy = True
+            except Exception:
+                healthy = False
+            self.mark(engine, healthy)
+
+    async def check_forever(self, interval: float, timeout: float = REPLICA_CHECK_TIMEOUT) -> None:
+        """Re-checks every replica each ``interval`` seconds; runs as a lifespan task until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.check(timeout)
+            except Exception as e:
+                logging.error(e, exc_info=True)
+
+    def clear(self) -> None:
+        self._pins.clear()
+        self.healthy = [True] * len(self.engines)
+
+
+class PrimarySession(Session):
+    """Session for the primary; a commit pins the requesting client's reads to the primary."""
+
+    def commit(self) -> None:
+        super().commit()
+        read_router.pin(self.info.get("client"))
+
+
+# The engine is created on first use rather than at import, so importing the models (tests,
+# Alembic, tooling) never opens a pool. SessionLocal is bound when the engine is created.
+SessionLocal = async_sessionmaker(expire_on_commit=False, sync_session_class=PrimarySession)
+_engine: AsyncEngine | None = None
+_database_url = DATABASE_URL
+_replica_urls: list[str] = list(DATABASE_REPLICA_URLS)
+_sqlite_tuned = SQLITE_TUNED
+_sqlite_mode = False
+_engine_hooks: list[Callable[[AsyncEngine], None]] = []
+read_router = ReadRouter(READ_YOUR_WRITES_SECONDS)
+
+
+def configure_engine(url: str, replica_urls: list[str] | tuple = (), sqlite_tuned: bool = SQLITE_TUNED) -> None:
+    """Sets the primary and replica URLs, and whether a SQLite file runs tuned, for the next engines."""
+    global _database_url, _replica_urls, _sqlite_tuned
+    if _engine is not None and (url != _database_url or list(replica_urls) != _replica_urls or sqlite_tuned != _sqlite_tuned):
+        raise RuntimeError("The engine is already running; dispose it before changing DATABASE_URL")
+    _database_url = url
+    _replica_urls = list(replica_urls)
+    _sqlite_tuned = sqlite_tuned
+
+
+def sqlite_mode() -> bool:
+    """Whether the running primary is a tuned SQLite file with a single writer connection."""
+    return _engine is not None and _sqlite_mode
+
+
+def current_engine() -> AsyncEngine | None:
+    """The primary engine if it has been created, without creating it."""
+    return _engine
+
+
+def on_engine_created(hook: Callable[[AsyncEngine], None]) -> None:
+    """Runs ``hook`` on every engine (primary and replicas) created from now on, and on current ones."""
+    if hook in _engine_hooks:
+        return
+    _engine_hooks.append(hook)
+    if _engine is not None:
+        for engine in [_engine, *read_router.engines]:
+            hook(engine)
+
+
+def get_engine() -> AsyncEngine:
+    """The primary engine, creating it and the replica engines on first use.
+
+    A SQLite file in tuned mode gets a single-connection writer as the primary and a pooled
+    reader set in place of replicas (unless real replicas are configured).
+    """
+    global _engine, _sqlite_mode
+    if _engine is None:
+        replicas = [create_async_engine(to_async_url(url), **engine_options(url)) for url in _replica_urls]
+        _sqlite_mode = _sqlite_tuned and is_sqlite_file(_database_url)
+        if _sqlite_mode:
+            _engine = sqlite_engine(_database_url, writer=True)
+            read_router.set_engines(replicas or [sqlite_engine(_database_url, writer=False)], consistent=not replicas)
+        else:
+            _engine = create_async_engine(to_async_url(_database_url), **engine_options(_database_url))
+            read_router.set_engines(replicas)
+        SessionLocal.configure(bind=_engine)
+        for engine in [_engine, *read_router.engines]:
+            for hook in _engine_hooks:
+                hook(engine)
+    return _engine
+
+
+async def dispose_engine() -> None:
+    global _engine
+    if _engine is not None:
+        engines, _engine = [_engine, *read_router.engines], None
+        read_router.set_engines([])
+        for engine in engines:
+            await engine.dispose()
+
+
+def _reset_after_fork() -> None:
+    """Gives a forked child its own engine; the parent's pooled connections are left untouched.
+
+    ``dispose(close=False)`` drops the inherited pool without closing sockets the parent still uses.
+    """
+    global _engine
+    if _engine is not None:
+        for engine in [_engine, *read_router.engines]:
+            engine.sync_engine.dispose(close=False)
+        read_router.set_engines([])
+        _engine = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def client_key(request: Request) -> Optional[str]:
+    return request.client.host if request.client else None
+
+
+async def get_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Session on the primary, for writes and for reads that must be current."""
+    get_engine()
+    async with SessionLocal(info={"client": client_key(request)}) as session:
+        yield session
+
 
+async def get_read_db(request: Request, primary=Depends(get_db)) -> AsyncIterator[AsyncSession]:
+    """Session for read-only work: a healthy replica, or ``primary`` when there is none to use.
 
-def get_db() -> Session:
-    session = scoped_session(sessionmaker(bind=engine))
-    try:
+    ``primary`` is only a session object until it runs a statement, so taking it costs no
+    connection; it is the fallback when no replica is configured or healthy, when the client is
+    pinned after a write, and when the chosen replica fails at checkout.
+    """
+    engine = None if read_router.pinned(client_key(request)) else read_router.pick()
+    if engine is None:
+        yield primary
+        return
+    async with SessionLocal(bind=engine) as session:
+        try:
+            await session.connection()
+        except Exception as e:
+            logging.warning("replica checkout failed, reading from the primary: %s", e)
+            read_router.mark(engine, False)
+            session = primary
         yield session
-    finally:
-        session.close()
\ No newline at end of file
@@ -0,0 +1,257 @@
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, false, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ta_user_svc.models.audit import AuditEvent
+from ta_user_svc.models.user import User, normalize_email
+from ta_user_svc.services.login_cache import LoginRecord
+
+# Queries accept either an AsyncSession (the default from get_db) or a plain Session
+# (e.g. a dependency override); sync sessions are driven from the threadpool so the
+# event loop never blocks on I/O.
+DbSession = AsyncSession | Session
+
+# Rows/parameters per statement for batch queries; keeps multi-row statements under SQLite's variable limit.
+BATCH_CHUNK_SIZE = 500
+
+
+async def execute(db: DbSession, statement, params=None):
+    if isinstance(db, AsyncSession):
+        return await db.execute(statement, params)
+    return await run_in_threadpool(db.execute, statement, params)
+
+
+async def commit(db: DbSession) -> None:
+    if isinstance(db, AsyncSession):
+        await db.commit()
+    else:
+        await run_in_threadpool(db.commit)
+
+
+async def rollback(db: DbSession) -> None:
+    if isinstance(db, AsyncSession):
+        await db.rollback()
+    else:
+        await run_in_threadpool(db.rollback)
+
+
+async def get_user_by_email(db: DbSession, email: str) -> User | None:
+    """Case-insensitive lookup through the normalized-email index."""
+    result = await execute(db, select(User).where(User.email_normalized == normalize_email(email)).limit(1))
+    return result.scalars().first()
+
+
+async def get_login_record(db: DbSession, email: str) -> LoginRecord | None:
+    """Fetches only the columns login needs, as a compact record instead of an ORM instance.
+
+    The projection matches ``ix_users_login``, so SQLite answers it from the covering index alone.
+    """
+    statement = (
+        select(User.email, User.passhash, User.approved, User.nickname)
+        .where(User.email_normalized == normalize_email(email))
+        .limit(1)
+    )
+    row = (await execute(db, statement)).first()
+    return LoginRecord(*row) if row is not None else None
+
+
+async def add_user(db: DbSession, user: User) -> User:
+    """Inserts ``user``; raises ``IntegrityError`` (after rolling back) if the email already exists."""
+    db.add(user)
+    try:
+        await commit(db)
+    except IntegrityError:
+        await rollback(db)
+        raise
+    if isinstance(db, AsyncSession):
+        await db.refresh(user)
+    else:
+        await run_in_threadpool(db.refresh, user)
+    return user
+
+
+def _insert_ignoring_conflicts(db: DbSession, model):
+    # INSERT ... ON CONFLICT DO NOTHING where the dialect has it; None means fall back to IntegrityError.
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    return None
+
+
+async def insert_user_if_absent(db: DbSession, values: dict) -> bool:
+    """Inserts one user atomically; returns False if the email (in any case) is already taken.
+
+    The conflict is settled by the unique indexes in the INSERT itself, so two concurrent
+    registrations of one address cannot both pass a SELECT and then collide.
+    """
+    values = {"email_normalized": normalize_email(values["email"]), **values}
+    statement = _insert_ignoring_conflicts(db, User)
+    try:
+        if statement is None:
+            await execute(db, insert(User).values(values))
+            inserted = True
+        else:
+            inserted = (await execute(db, statement.values(values))).rowcount == 1
+        await commit(db)
+    except IntegrityError:
+        await rollback(db)
+        return False
+    except Exception:
+        await rollback(db)
+        raise
+    return inserted
+
+
+async def insert_users_if_absent(db: DbSession, rows: list[dict]) -> list[bool]:
+    """Inserts each row unless its email is taken, all in one transaction; returns which were inserted.
+
+    Needs a dialect with ON CONFLICT DO NOTHING (SQLite or PostgreSQL): a conflict must skip
+    its row without aborting the others.
+    """
+    statement = _insert_ignoring_conflicts(db, User)
+    if statement is None:
+        raise NotImplementedError(f"{db.get_bind().dialect.name} has no ON CONFLICT DO NOTHING")
+    inserted = []
+    try:
+        for values in rows:
+            values = {"email_normalized": normalize_email(values["email"]), **values}
+            inserted.append((await execute(db, statement.values(values))).rowcount == 1)
+        await commit(db)
+    except Exception:
+        await rollback(db)
+        raise
+    return inserted
+
+
+async def get_existing_emails(db: DbSession, emails: list[str]) -> set[str]:
+    """Returns the normalized form of every email in ``emails`` that is already registered."""
+    existing = set()
+    normalized = list({normalize_email(email) for email in emails})
+    for start in range(0, len(normalized), BATCH_CHUNK_SIZE):
+        chunk = normalized[start:start + BATCH_CHUNK_SIZE]
+        result = await execute(db, select(User.email_normalized).where(User.email_normalized.in_(chunk)))
+        existing.update(result.scalars().all())
+    return existing
+
+
+async def get_user_statuses(db: DbSession, emails: list[str]) -> dict[str, tuple[bool, str]]:
+    """Maps the normalized form of each registered email in ``emails`` to its ``(approved, role)``."""
+    statuses = {}
+    normalized = list({normalize_email(email) for email in emails})
+    for start in range(0, len(normalized), BATCH_CHUNK_SIZE):
+        chunk = normalized[start:start + BATCH_CHUNK_SIZE]
+        statement = select(User.email_normalized, User.approved, User.role).where(User.email_normalized.in_(chunk))
+        for email, approved, role in (await execute(db, statement)).all():
+            statuses[email] = (approved, role)
+    return statuses
+
+
+async def insert_users(db: DbSession, rows: list[dict]) -> None:
+    """Inserts ``rows`` with multi-row INSERT statements inside a single transaction."""
+    if not rows:
+        return
+    try:
+        for start in range(0, len(rows), BATCH_CHUNK_SIZE):
+            await execute(db, insert(User).values(rows[start:start + BATCH_CHUNK_SIZE]))
+        await commit(db)
+    except Exception:
+        await rollback(db)
+        raise
+
+
+async def update_passhash(db: DbSession, email: str, old_passhash: str, new_passhash: str) -> bool:
+    """Replaces the hash only if it is still ``old_passhash``, so a concurrent password change wins."""
+    statement = update(User).where(User.email == email, User.passhash == old_passhash).values(passhash=new_passhash)
+    result = await execute(db, statement)
+    await commit(db)
+    return result.rowcount == 1
+
+
+async def get_pending_users(db: DbSession, after: str | None, limit: int) -> list:
+    """Returns up to ``limit`` unapproved users with ``email > after``, in email order.
+
+    Keyset pagination: each page is one range scan of ``ix_users_pending`` however deep it is.
+    ``false()`` renders as a literal so SQLite can match the partial index's predicate.
+    """
+    statement = select(User.email, User.nickname).where(User.approved == false())
+    if after is not None:
+        statement = statement.where(User.email > after)
+    result = await execute(db, statement.order_by(User.email).limit(limit))
+    return result.all()
+
+
+def _pending_chunks(emails: list[str] | None, email_domain: str | None):
+    # One WHERE clause per statement: the domain filter, or the email list in IN-sized chunks.
+    pending = User.approved == false()
+    if emails is None:
+        yield [pending, User.email_normalized.endswith("@" + normalize_email(email_domain), autoescape=True)]
+        return
+    normalized = list({normalize_email(email) for email in emails})
+    for start in range(0, len(normalized), BATCH_CHUNK_SIZE):
+        yield [pending, User.email_normalized.in_(normalized[start:start + BATCH_CHUNK_SIZE])]
+
+
+async def _decide_pending(db: DbSession, statement, emails: list[str] | None, email_domain: str | None) -> list[str]:
+    affected = []
+    try:
+        for where in _pending_chunks(emails, email_domain):
+            result = await execute(db, statement.where(*where).returning(User.email_normalized))
+            affected.extend(result.scalars().all())
+        await commit(db)
+    except Exception:
+        await rollback(db)
+        raise
+    return affected
+
+
+async def approve_pending_users(db: DbSession, emails: list[str] | None = None, email_domain: str | None = None) -> list[str]:
+    """Approves pending users named in ``emails`` or, if it is None, every pending user at ``email_domain``.
+
+    Runs as set-based UPDATEs in one transaction and returns the normalized emails it changed.
+    """
+    statement = update(User).values(approved=True).execution_options(synchronize_session=False)
+    return await _decide_pending(db, statement, emails, email_domain)
+
+
+async def reject_pending_users(db: DbSession, emails: list[str] | None = None, email_domain: str | None = None) -> list[str]:
+    """Deletes pending registrations selected like ``approve_pending_users``; approved users are never touched."""
+    statement = delete(User).execution_options(synchronize_session=False)
+    return await _decide_pending(db, statement, emails, email_domain)
+
+
+async def stream_users(db: DbSession, columns: list[str], role: str | None = None, approved: bool | None = None, batch_size: int = 1000):
+    """Yields ``users`` rows as lists of up to ``batch_size`` column tuples, in email order.
+
+    ``yield_per`` fetches from a server-side cursor, so memory holds one batch however large the
+    table is. Plain column tuples skip the ORM identity map entirely.
+    """
+    statement = select(*(getattr(User, column) for column in columns)).order_by(User.email)
+    if role is not None:
+        statement = statement.where(User.role == role)
+    if approved is not None:
+        statement = statement.where(User.approved == approved)
+    statement = statement.execution_options(yield_per=batch_size)
+    if isinstance(db, AsyncSession):
+        result = await db.stream(statement)
+        async for partition in result.partitions():
+            yield partition
+    else:
+        result = await run_in_threadpool(db.execute, statement)
+        partitions = result.partitions()
+        while (partition := await run_in_threadpool(next, partitions, None)) is not None:
+            yield partition
+
+
+async def insert_audit_events(db: DbSession, rows: list[dict]) -> None:
+    """Writes a batch of audit rows with one executemany and one commit."""
+    try:
+        await execute(db, insert(AuditEvent), rows)
+        await commit(db)
+    except Exception:
+        await rollback(db)
+        raise
@@ -1,11 +1,33 @@
-from sqlalchemy import Column, String, Boolean
+from sqlalchemy import Column, String, Boolean, Index, func, text
 from ta_user_svc.models.base import Base
 
+
+def normalize_email(email: str) -> str:
+    # Emails are matched case-insensitively; the stored ``email`` keeps the user's spelling.
+    return email.strip().lower()
+
+
+def _normalized_default(context) -> str:
+    return normalize_email(context.get_current_parameters()["email"])
+
+
 class User(Base):
     __tablename__ = "users"
 
-    email = Column(String, primary_key=True, index=True)
+    email = Column(String, primary_key=True)
+    email_normalized = Column(String, nullable=False, default=_normalized_default)
     passhash = Column(String, nullable=False)
     nickname = Column(String, nullable=False)
     role = Column(String, default="user", nullable=False)
     approved = Column(Boolean, default=False, nullable=False)
+
+    __table_args__ = (
+        # One account per address regardless of case. It is an expression index so that the
+        # planner never prefers it over ix_users_login (SQLite always picks a unique equality
+        # match, which would cost a table lookup per login).
+        Index("ux_users_email_lower", func.lower(func.trim(email)), unique=True),
+        # Covers the login projection, so login reads the index and never the table.
+        Index("ix_users_login", "email_normalized", "email", "passhash", "approved", "nickname"),
+        # Only pending users, in email order: the approval queue's keyset scan.
+        Index("ix_users_pending", "email", sqlite_where=text("approved = 0"), postgresql_where=text("NOT approved")),
+    )
@@ -1 +1 @@
-from .user_registration import router as user_registration_router
+# Routers are imported by ta_user_svc.app.create_app when the application is built.
@@ -0,0 +1,128 @@
+import logging
+from typing import List, Optional
+
+import jwt
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, model_validator
+
+from ta_user_svc.config import ADMIN_BULK_MAX, ADMIN_PAGE_SIZE, ADMIN_PAGE_SIZE_MAX, EXPORT_BATCH_SIZE
+from ta_user_svc.models.base import SessionLocal, get_db, get_engine, get_read_db
+from ta_user_svc.models.queries import DbSession, approve_pending_users, get_pending_users, get_user_by_email, reject_pending_users, stream_users
+from ta_user_svc.routers.user_logout import bearer_token
+from ta_user_svc.services.export import EXPORT_COLUMNS, FORMATS, export_chunks
+from ta_user_svc.services.login_cache import login_cache
+from ta_user_svc.services.tokens import verify_token
+
+router = APIRouter()
+
+
+class PendingUser(BaseModel):
+    email: str
+    nickname: str
+
+
+class PendingUsersPage(BaseModel):
+    users: List[PendingUser]
+    # Pass as ``after`` to fetch the next page; None on the last page.
+    next_after: Optional[str] = None
+
+
+class PendingDecisionRequest(BaseModel):
+    # Exactly one selector: explicit emails, or every pending user at a domain.
+    emails: Optional[List[str]] = Field(None, min_length=1, max_length=ADMIN_BULK_MAX)
+    email_domain: Optional[str] = Field(None, min_length=1)
+
+    @model_validator(mode="after")
+    def one_selector(self):
+        if (self.emails is None) == (self.email_domain is None):
+            raise ValueError("Provide exactly one of emails or email_domain.")
+        return self
+
+
+class PendingDecisionResponse(BaseModel):
+    affected: int
+
+
+async def require_admin(authorization: Optional[str] = Header(None), db: DbSession = Depends(get_db)) -> str:
+    """Accepts only a valid, unrevoked access token whose subject currently has the ``admin`` role.
+
+    The role is read from the database rather than the token, so a demotion takes effect at once.
+    """
+    token = bearer_token(authorization)
+    if token is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    try:
+        claims = verify_token(token)
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    user = await get_user_by_email(db, claims.get("sub") or "")
+    if user is None or user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required")
+    return user.email
+
+
+@router.get("/users/pending", response_model=PendingUsersPage)
+async def list_pending_users(
+    after: Optional[str] = Query(None, description="Last email of the previous page"),
+    limit: int = Query(ADMIN_PAGE_SIZE, ge=1, le=ADMIN_PAGE_SIZE_MAX),
+    admin: str = Depends(require_admin),
+    db: DbSession = Depends(get_read_db),
+):
+    try:
+        # One extra row tells whether another page exists without a COUNT.
+        rows = await get_pending_users(db, after, limit + 1)
+        users = [PendingUser(email=row.email, nickname=row.nickname) for row in rows[:limit]]
+        next_after = users[-1].email if len(rows) > limit else None
+        return PendingUsersPage(users=users, next_after=next_after)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+
+
+async def _decide(decide, request: PendingDecisionRequest, admin: str, db: DbSession) -> PendingDecisionResponse:
+    try:
+        affected = await decide(db, request.emails, request.email_domain)
+        # One pass over the cache for the whole batch; cached "not approved" records must not outlive the change.
+        login_cache.invalidate_many(affected)
+        logging.info("%s by %s affected %d users", decide.__name__, admin, len(affected))
+        return PendingDecisionResponse(affected=len(affected))
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+
+
+@router.post("/users/approve", response_model=PendingDecisionResponse)
+async def approve_users(request: PendingDecisionRequest, admin: str = Depends(require_admin), db: DbSession = Depends(get_db)):
+    return await _decide(approve_pending_users, request, admin, db)
+
+
+@router.post("/users/reject", response_model=PendingDecisionResponse)
+async def reject_users(request: PendingDecisionRequest, admin: str = Depends(require_admin), db: DbSession = Depends(get_db)):
+    return await _decide(reject_pending_users, request, admin, db)
+
+
+async def _export_body(fmt: str, compress: bool, role: Optional[str], approved: Optional[bool]):
+    # The request's session is closed before a streaming body runs, so the export owns one.
+    get_engine()
+    async with SessionLocal() as db:
+        partitions = stream_users(db, EXPORT_COLUMNS, role, approved, EXPORT_BATCH_SIZE)
+        async for chunk in export_chunks(partitions, EXPORT_COLUMNS, fmt, compress):
+            yield chunk
+
+
+@router.get("/users/export")
+async def export_users(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = Query(False, description="Compress the stream; served as a .gz download"),
+    role: Optional[str] = Query(None),
+    approved: Optional[bool] = Query(None),
+    admin: str = Depends(require_admin),
+):
+    filename = f"users.{format}" + (".gz" if gzip else "")
+    logging.info("users export (%s) by %s", filename, admin)
+    return StreamingResponse(
+        _export_body(format, gzip, role, approved),
+        media_type="application/gzip" if gzip else FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from ta_user_svc.services.profiling import stack_aggregate
+
+router = APIRouter()
+
+
+@router.get("/debug/profiles", include_in_schema=False)
+def profiles():
+    # Top-N heaviest call stacks per route, aggregated over every profiled request.
+    return stack_aggregate.snapshot()
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Request, Response, status
+
+from ta_user_svc.config import JWKS_MAX_AGE
+from ta_user_svc.services import tokens
+
+router = APIRouter()
+
+
+@router.get("/.well-known/jwks.json", include_in_schema=False)
+def jwks(request: Request):
+    # The body and ETag are computed once when the key ring loads; consumers cache and revalidate.
+    ring = tokens.key_ring
+    headers = {"ETag": ring.etag, "Cache-Control": f"public, max-age={JWKS_MAX_AGE}, stale-while-revalidate={JWKS_MAX_AGE}"}
+    if ring.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=ring.jwks_body, media_type="application/json", headers=headers)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ta_user_svc.services.metrics import CONTENT_TYPE, registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    # Prometheus text exposition format; gauges are sampled now, everything else is already aggregated.
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
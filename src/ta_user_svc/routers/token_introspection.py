@@ -0,0 +1,63 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field
+
+from ta_user_svc.config import INTROSPECT_MAX_TOKENS
+from ta_user_svc.models.base import get_read_db
+from ta_user_svc.models.queries import DbSession
+from ta_user_svc.models.user import normalize_email
+from ta_user_svc.services.fast_json import JSONResponseClass
+from ta_user_svc.services.introspection import user_status_batcher
+from ta_user_svc.services.tokens import verify_tokens
+
+router = APIRouter()
+
+
+class IntrospectionRequest(BaseModel):
+    tokens: List[str] = Field(..., min_length=1, max_length=INTROSPECT_MAX_TOKENS)
+
+
+class TokenStatus(BaseModel):
+    active: bool
+    claims: Optional[Dict[str, Any]] = None
+    role: Optional[str] = None
+    # Why an inactive token is inactive: invalid | expired | revoked | unknown_user | not_approved
+    reason: Optional[str] = None
+
+
+class IntrospectionResponse(BaseModel):
+    results: List[TokenStatus]
+
+
+@router.post("/tokens/introspect", response_model=IntrospectionResponse)
+async def introspect_tokens(request: IntrospectionRequest, db: DbSession = Depends(get_read_db)):
+    """Reports, per token, whether it is still valid and its user still exists and is approved.
+
+    Signatures and revocations are checked for the whole batch first, then the distinct
+    subjects are looked up together, in a query shared with concurrent introspection calls.
+    """
+    try:
+        verified = verify_tokens(request.tokens)
+        subjects = {normalize_email(claims["sub"]) for claims, _ in verified if claims and claims.get("sub")}
+        statuses = await user_status_batcher.lookup(db, subjects) if subjects else {}
+
+        results = []
+        for claims, reason in verified:
+            if claims is not None and not claims.get("sub"):
+                claims, reason = None, "invalid"
+            if claims is None:
+                results.append({"active": False, "claims": None, "role": None, "reason": reason})
+                continue
+            user = statuses.get(normalize_email(claims["sub"]))
+            if user is None:
+                results.append({"active": False, "claims": None, "role": None, "reason": "unknown_user"})
+            elif not user[0]:
+                results.append({"active": False, "claims": None, "role": user[1], "reason": "not_approved"})
+            else:
+                results.append({"active": True, "claims": claims, "role": user[1], "reason": None})
+        return JSONResponseClass({"results": results})
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
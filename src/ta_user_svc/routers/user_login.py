@@ -1,21 +1,23 @@
-import os
 import logging
-from datetime import datetime, timedelta
+import time
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
 from pydantic import BaseModel, EmailStr, Field
-from sqlalchemy.orm import Session
 
-import jwt  # PyJWT
-from passlib.context import CryptContext
-
-from ta_user_svc.models.user import User
-from ta_user_svc.models.base import get_db
+from ta_user_svc.config import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_MINUTES
+from ta_user_svc.models.base import SessionLocal, get_read_db
+from ta_user_svc.models.queries import DbSession, get_login_record, update_passhash
+from ta_user_svc.models.user import normalize_email
+from ta_user_svc.services.audit import audit_log
+from ta_user_svc.services.fast_json import JSONResponseClass
+from ta_user_svc.services.login_cache import MISSING, LoginRecord, login_cache
+from ta_user_svc.services.password_hasher import HasherOverloadedError, hash_passwords, needs_rehash, password_hasher, verify_password
+from ta_user_svc.services.rate_limiter import LOGIN_PER_EMAIL, LOGIN_PER_IP, RateLimitExceeded, rate_limiter, retry_after_header
+from ta_user_svc.services.single_flight import credentials_key, login_flight
+from ta_user_svc.services.tokens import encode_token, new_jti
 
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str = Field(..., min_length=6)
@@ -24,35 +26,86 @@ class TokenResponse(BaseModel):
     access_token: str
     refresh_token: str
 
-JWT_SECRET = os.getenv("JWT_SECRET", "mysecret")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "10"))
-REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", "1440"))
+async def rehash_password(email: str, password: str, old_passhash: str) -> None:
+    """Upgrades a hash made under an older scheme or cost; runs after the login response is sent.
+
+    Uses the low-priority batch path of the hashing pool and its own session, since the
+    request's session is closed by the time background tasks run.
+    """
+    try:
+        (new_passhash,) = await hash_passwords([password])
+        async with SessionLocal() as db:
+            if await update_passhash(db, email, old_passhash, new_passhash):
+                login_cache.invalidate(normalize_email(email))
+    except Exception as e:
+        logging.error(e, exc_info=True)
+
+
+async def check_credentials(db: DbSession, email: str, password: str) -> tuple[LoginRecord | None, bool]:
+    """Looks up ``email`` and verifies ``password``; returns the record (None if unknown) and the verdict."""
+    user = login_cache.get(email)
+    if user is MISSING:
+        generation = login_cache.generation
+        user = await get_login_record(db, email)
+        login_cache.put(email, user, generation)
+    if user is None:
+        # Unknown account: pay the same bcrypt cost so timing doesn't reveal whether it exists.
+        await verify_password(password, await password_hasher.dummy_hash())
+        return None, False
+    return user, await verify_password(password, user.passhash)
+
 
 @router.post("/login", response_model=TokenResponse)
-def login(login_request: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_request: LoginRequest, request: Request, background_tasks: BackgroundTasks, db: DbSession = Depends(get_read_db)):
     try:
-        user = db.query(User).filter(User.email == login_request.email).first()
-        if not user or not pwd_context.verify(login_request.password, user.passhash):
+        # Throttle before any DB or bcrypt work so a credential-stuffing burst stays cheap to refuse.
+        client_ip = request.client.host if request.client else "unknown"
+        email = normalize_email(login_request.email)
+        await rate_limiter.check_async((LOGIN_PER_IP, client_ip), (LOGIN_PER_EMAIL, email))
+        # Retried copies of the same body (same email and password) share one lookup and verify.
+        (user, verified), shared = await login_flight.do(
+            credentials_key(email, login_request.password),
+            lambda: check_credentials(db, email, login_request.password),
+        )
+        if user is None:
+            audit_log.record("login_failed", email, client_ip, "unknown_user")
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        if not verified:
+            audit_log.record("login_failed", email, client_ip, "bad_password")
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        if needs_rehash(user.passhash) and not shared:
+            background_tasks.add_task(rehash_password, user.email, login_request.password, user.passhash)
         if not user.approved:
+            audit_log.record("login_unapproved", email, client_ip)
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not approved")
 
-        now = datetime.utcnow()
+        now = int(time.time())
         access_payload = {
             "sub": user.email,
             "nickname": user.nickname,
-            "exp": now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+            "jti": new_jti(),
+            "exp": now + ACCESS_TOKEN_EXPIRE_MINUTES * 60
         }
         refresh_payload = {
             "sub": user.email,
             "nickname": user.nickname,
-            "exp": now + timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES)
+            "jti": new_jti(),
+            "exp": now + REFRESH_TOKEN_EXPIRE_MINUTES * 60
         }
-        access_token = jwt.encode(access_payload, JWT_SECRET, algorithm="HS256")
-        refresh_token = jwt.encode(refresh_payload, JWT_SECRET, algorithm="HS256")
-        return TokenResponse(access_token=access_token, refresh_token=refresh_token)
+        access_token = encode_token(access_payload)
+        refresh_token = encode_token(refresh_payload)
+        audit_log.record("login_succeeded", email, client_ip)
+        # Built from plain strings, so it is returned as-is; response_model only documents it.
+        return JSONResponseClass({"access_token": access_token, "refresh_token": refresh_token})
     except HTTPException:
         raise
+    except RateLimitExceeded as e:
+        logging.warning(e)
+        audit_log.record("login_rate_limited", email, client_ip)
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many requests", headers=retry_after_header(e))
+    except HasherOverloadedError as e:
+        logging.warning(e)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Service busy, retry later", headers={"Retry-After": "1"})
     except Exception as e:
         logging.error(e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
@@ -1,16 +1,52 @@
 import logging
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+import jwt
+from fastapi import APIRouter, Header, HTTPException, status
 from fastapi import Query
+from starlette.concurrency import run_in_threadpool
+
+from ta_user_svc.services.revocation import revocation_store
+from ta_user_svc.services.tokens import decode_token_cached
 
 router = APIRouter()
 
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return token.strip()
+
+
 @router.get("/logout")
-async def logout(force_error: bool = Query(False, description="Force error for testing purposes")):
+async def logout(
+    force_error: bool = Query(False, description="Force error for testing purposes"),
+    authorization: Optional[str] = Header(None),
+    x_refresh_token: Optional[str] = Header(None),
+):
     try:
         if force_error:
             # This branch is for testing exception handling
             raise Exception("Forced error")
+        # Revoke the presented access token (Authorization: Bearer) and refresh token (X-Refresh-Token).
+        for token in (bearer_token(authorization), x_refresh_token):
+            if not token:
+                continue
+            try:
+                claims = decode_token_cached(token)
+            except jwt.ExpiredSignatureError:
+                continue  # already unusable
+            except jwt.InvalidTokenError:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+            if claims.get("jti") is not None and claims.get("exp") is not None:
+                # May write through to the persistent store, so keep it off the event loop.
+                await run_in_threadpool(revocation_store.revoke, claims["jti"], float(claims["exp"]))
         return {"message": "Logout successful"}
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(e, exc_info=True)
         raise HTTPException(status_code=500, detail="An error occurred while logging out")
@@ -1,16 +1,17 @@
-import os
 import logging
-from datetime import datetime, timedelta
+import time
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 from pydantic import BaseModel
 
 import jwt
 
-router = APIRouter()
+from ta_user_svc.config import ACCESS_TOKEN_EXPIRE_MINUTES
+from ta_user_svc.services.fast_json import JSONResponseClass
+from ta_user_svc.services.rate_limiter import REFRESH_PER_IP, RateLimitExceeded, rate_limiter, retry_after_header
+from ta_user_svc.services.tokens import TokenRevokedError, encode_token, new_jti, verify_token
 
-JWT_SECRET = os.getenv("JWT_SECRET", "mysecret")
-ACCESS_TOKEN_EXPIRE_MINUTES = 10
+router = APIRouter()
 
 class RefreshRequest(BaseModel):
     refresh_token: str
@@ -19,26 +20,35 @@ class TokenResponse(BaseModel):
     access_token: str
 
 @router.post("/refresh", response_model=TokenResponse)
-def refresh_token(refresh_req: RefreshRequest):
+def refresh_token(refresh_req: RefreshRequest, request: Request):
     try:
-        # Placeholder for rate limiting: integrate proper rate limiter here.
-        decoded_payload = jwt.decode(refresh_req.refresh_token, JWT_SECRET, algorithms=["HS256"])
+        # Throttled per client address before the token is even decoded.
+        rate_limiter.check((REFRESH_PER_IP, request.client.host if request.client else "unknown"))
+        # Repeat presentations of the same refresh token are served from the verified-claims cache;
+        # the revocation check still runs on every call.
+        decoded_payload = verify_token(refresh_req.refresh_token)
         user_email = decoded_payload.get("sub")
         nickname = decoded_payload.get("nickname")
         if not user_email or not nickname:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
         
-        now = datetime.utcnow()
         new_payload = {
             "sub": user_email,
             "nickname": nickname,
-            "exp": now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+            "jti": new_jti(),
+            "exp": int(time.time()) + ACCESS_TOKEN_EXPIRE_MINUTES * 60
         }
-        new_access_token = jwt.encode(new_payload, JWT_SECRET, algorithm="HS256")
-        return TokenResponse(access_token=new_access_token)
+        new_access_token = encode_token(new_payload)
+        return JSONResponseClass({"access_token": new_access_token})
+    except RateLimitExceeded as e:
+        logging.warning(e)
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many requests", headers=retry_after_header(e))
     except jwt.ExpiredSignatureError as e:
         logging.error(e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token expired")
+    except TokenRevokedError as e:
+        logging.warning(e)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token revoked")
     except jwt.InvalidTokenError as e:
         logging.error(e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
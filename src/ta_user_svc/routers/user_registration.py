@@ -1,18 +1,29 @@
+import json
 import logging
 import re
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import BaseModel, Field, ValidationError
 from email_validator import validate_email, EmailNotValidError
-from sqlalchemy.orm import Session
-from passlib.hash import bcrypt_sha256
+from sqlalchemy.exc import IntegrityError
+from starlette.requests import ClientDisconnect
 
-from ta_user_svc.models.base import get_db
-from ta_user_svc.models.user import User
+from ta_user_svc.config import BULK_REGISTRATION_MAX, BULK_STREAM_BATCH_SIZE
+from ta_user_svc.models.base import SessionLocal, get_db
+from ta_user_svc.models.queries import DbSession, get_existing_emails, get_user_by_email, insert_users, rollback
+from ta_user_svc.models.user import normalize_email
+from ta_user_svc.services.audit import audit_log
+from ta_user_svc.services.login_cache import login_cache
+from ta_user_svc.services.password_hasher import HasherOverloadedError, hash_password, hash_passwords
+from ta_user_svc.services.single_flight import registration_flight
+from ta_user_svc.services.user_writer import insert_user
 
 router = APIRouter()
 
 # Constant for nickname regex pattern
 NICKNAME_REGEX = r"[A-Za-z0-9_.-]+"
+NICKNAME_PATTERN = re.compile(NICKNAME_REGEX)
 
 
 class UserRegistrationRequest(BaseModel):
@@ -28,59 +39,243 @@ class UserResponse(BaseModel):
     approved: bool
 
 
+class BulkRegistrationRequest(BaseModel):
+    # Items are validated one by one so a malformed entry is reported, not a 422 for the batch.
+    users: List[Any] = Field(..., min_length=1, max_length=BULK_REGISTRATION_MAX)
+
+
+class BulkRegistrationItem(BaseModel):
+    index: int
+    email: Optional[str] = None
+    status: str  # created | invalid | duplicate
+    detail: Optional[str] = None
+
+
+class BulkRegistrationResponse(BaseModel):
+    created: int
+    results: List[BulkRegistrationItem]
+
+
+def email_error(email: str) -> Optional[str]:
+    # Validate email format with deliverability check disabled.
+    try:
+        validate_email(email, check_deliverability=False)
+    except EmailNotValidError as e:
+        return str(e)
+    return None
+
+
+def credentials_error(password: str, nickname: str) -> Optional[str]:
+    # Validate password: length and at least one letter
+    if not (8 <= len(password) <= 32):
+        return "Password must be between 8 and 32 characters."
+    if not any(c.isalpha() for c in password):
+        return "Password must contain at least one letter."
+    # Validate nickname: length and allowed characters
+    if not (4 <= len(nickname) <= 32):
+        return "Nickname must be between 4 and 32 characters."
+    if not NICKNAME_PATTERN.fullmatch(nickname):
+        return "Nickname can only contain letters, digits, dash (-), underscore (_) and dot (.) characters."
+    return None
+
+
+async def create_user(db: DbSession, request: UserRegistrationRequest, client_ip: str) -> UserResponse:
+    """Checks, hashes and inserts one registration whose email is valid; raises 409 if it is taken."""
+    # Cheap duplicate check first, so a known address never costs a bcrypt hash.
+    existing_user = await get_user_by_email(db, request.email)
+    if existing_user:
+        audit_log.record("registration_failed", normalize_email(request.email), client_ip, "duplicate")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered.")
+    # Hand the connection back before hashing; in tuned SQLite mode it may be the only writer.
+    await rollback(db)
+
+    error = credentials_error(request.password, request.nickname)
+    if error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+    # Hash password with the shared hashing policy (see PASSWORD_SCHEME), off the event loop
+    try:
+        passhash = await hash_password(request.password)
+    except HasherOverloadedError as e:
+        logging.warning(e)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Service busy, retry later", headers={"Retry-After": "1"})
+    except Exception as hash_exception:
+        logging.error(hash_exception, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error hashing password")
+
+    new_user = UserResponse(email=request.email, nickname=request.nickname, role="user", approved=False)
+    if not await insert_user(db, {**new_user.model_dump(), "passhash": passhash}):
+        # Lost a race with a concurrent registration of the same email.
+        audit_log.record("registration_failed", normalize_email(request.email), client_ip, "duplicate")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered.")
+    # Drop any negative entry so the new account can log in immediately.
+    login_cache.invalidate(normalize_email(new_user.email))
+    audit_log.record("registered", normalize_email(new_user.email), client_ip)
+    return new_user
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 
-def register_user(request: UserRegistrationRequest, db: Session = Depends(get_db)):
+async def register_user(request: UserRegistrationRequest, http_request: Request, db: DbSession = Depends(get_db)):
+    client_ip = http_request.client.host if http_request.client else "unknown"
     try:
-        # Validate email format with deliverability check disabled. Performing this before DB lookup.
-        try:
-            validate_email(request.email, check_deliverability=False)
-        except EmailNotValidError as e:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        # Email format is checked before the DB lookup.
+        error = email_error(request.email)
+        if error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
 
-        # Check for duplicate email
-        existing_user = db.query(User).filter(User.email == request.email).first()
-        if existing_user:
+        # Duplicate submissions for one address share a single lookup, hash and insert; whoever
+        # joined an in-flight registration did not create the account and gets a 409.
+        new_user, shared = await registration_flight.do(normalize_email(request.email), lambda: create_user(db, request, client_ip))
+        if shared:
+            audit_log.record("registration_failed", normalize_email(request.email), client_ip, "duplicate")
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already registered.")
+        return new_user
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
 
-        # Validate password: length and at least one letter
-        if not (8 <= len(request.password) <= 32):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Password must be between 8 and 32 characters.")
-        if not any(c.isalpha() for c in request.password):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Password must contain at least one letter.")
 
-        # Validate nickname: length and allowed characters
-        if not (4 <= len(request.nickname) <= 32):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nickname must be between 4 and 32 characters.")
-        if not re.fullmatch(NICKNAME_REGEX, request.nickname):
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nickname can only contain letters, digits, dash (-), underscore (_) and dot (.) characters.")
+async def register_batch(db: DbSession, items: List[Any], offset: int = 0, client_ip: Optional[str] = None) -> List[BulkRegistrationItem]:
+    """Validates, de-duplicates, hashes and inserts a batch; returns one result per input item.
 
-        # Hash password using bcrypt_sha256 for improved security
+    Duplicates are found with one IN query, passwords are hashed on the hashing pool as
+    low-priority work, and accepted rows are written with multi-row INSERTs in a single
+    transaction.
+    """
+    results: List[Optional[BulkRegistrationItem]] = [None] * len(items)
+    users: List[Optional[UserRegistrationRequest]] = [None] * len(items)
+    seen = set()
+    for i, item in enumerate(items):
         try:
-            passhash = bcrypt_sha256.hash(request.password)
-        except Exception as hash_exception:
-            logging.error(hash_exception, exc_info=True)
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error hashing password")
-
-        new_user = User(
-            email=request.email,
-            passhash=passhash,
-            nickname=request.nickname,
-            role="user",
-            approved=False
-        )
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
-
-        return UserResponse(
-            email=new_user.email,
-            nickname=new_user.nickname,
-            role=new_user.role,
-            approved=new_user.approved
-        )
-    except HTTPException as he:
-        raise he
+            user = UserRegistrationRequest.model_validate(item)
+        except ValidationError:
+            results[i] = BulkRegistrationItem(index=offset + i, status="invalid", detail="Malformed user entry.")
+            continue
+        error = email_error(user.email) or credentials_error(user.password, user.nickname)
+        if error:
+            results[i] = BulkRegistrationItem(index=offset + i, email=user.email, status="invalid", detail=error)
+        elif normalize_email(user.email) in seen:
+            results[i] = BulkRegistrationItem(index=offset + i, email=user.email, status="duplicate", detail="Email repeated in batch.")
+        else:
+            seen.add(normalize_email(user.email))
+            users[i] = user
+
+    passhashes = {}
+    for attempt in range(2):
+        pending = [i for i, result in enumerate(results) if result is None]
+        existing = await get_existing_emails(db, [users[i].email for i in pending])
+        for i in pending:
+            if normalize_email(users[i].email) in existing:
+                results[i] = BulkRegistrationItem(index=offset + i, email=users[i].email, status="duplicate", detail="Email already registered.")
+        pending = [i for i in pending if results[i] is None]
+
+        # Hashes survive a retry; only rows that became duplicates are dropped.
+        unhashed = [i for i in pending if i not in passhashes]
+        passhashes.update(zip(unhashed, await hash_passwords([users[i].password for i in unhashed])))
+        rows = [
+            {
+                "email": users[i].email,
+                "email_normalized": normalize_email(users[i].email),
+                "passhash": passhashes[i],
+                "nickname": users[i].nickname,
+                "role": "user",
+                "approved": False,
+            }
+            for i in pending
+        ]
+        try:
+            await insert_users(db, rows)
+        except IntegrityError:
+            # A concurrent writer registered one of the emails after our IN check; re-check once.
+            if attempt:
+                raise
+            continue
+        login_cache.invalidate_many(normalize_email(users[i].email) for i in pending)
+        for i in pending:
+            results[i] = BulkRegistrationItem(index=offset + i, email=users[i].email, status="created")
+            audit_log.record("registered", normalize_email(users[i].email), client_ip, "bulk")
+        break
+    return results
+
+
+@router.post("/register/bulk", response_model=BulkRegistrationResponse)
+async def register_users_bulk(request: BulkRegistrationRequest, http_request: Request, db: DbSession = Depends(get_db)):
+    try:
+        client_ip = http_request.client.host if http_request.client else "unknown"
+        results = await register_batch(db, request.users, client_ip=client_ip)
+        created = sum(1 for result in results if result.status == "created")
+        return BulkRegistrationResponse(created=created, results=results)
     except Exception as e:
         logging.error(e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+
+
+async def _ndjson_lines(receive):
+    buffer = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ClientDisconnect()
+        buffer += message.get("body", b"")
+        more_body = message.get("more_body", False)
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None  # reported as a malformed entry
+
+
+class NdjsonRegistrationEndpoint:
+    """ASGI endpoint for ``POST /register/bulk/ndjson``.
+
+    Reads an NDJSON body of users incrementally and writes one NDJSON result per line as each
+    batch completes, so imports of any size run in constant memory. It drives ``receive`` and
+    ``send`` itself because a streaming response body cannot also read the request body.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_200_OK,
+            "headers": [(b"content-type", b"application/x-ndjson")],
+        })
+
+        async def write(results: List[BulkRegistrationItem]) -> None:
+            body = "".join(result.model_dump_json() + "\n" for result in results)
+            await send({"type": "http.response.body", "body": body.encode(), "more_body": True})
+
+        offset = 0
+        batch: List[Any] = []
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        try:
+            async with SessionLocal() as db:
+                async for line in _ndjson_lines(receive):
+                    batch.append(_parse_line(line))
+                    if len(batch) >= BULK_STREAM_BATCH_SIZE:
+                        await write(await register_batch(db, batch, offset, client_ip))
+                        offset += len(batch)
+                        batch = []
+                if batch:
+                    await write(await register_batch(db, batch, offset, client_ip))
+        except ClientDisconnect:
+            return
+        except Exception as e:
+            logging.error(e, exc_info=True)
+            error = json.dumps({"error": "Import aborted", "index": offset}) + "\n"
+            await send({"type": "http.response.body", "body": error.encode(), "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+router.add_route("/register/bulk/ndjson", NdjsonRegistrationEndpoint(), methods=["POST"])
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from ta_user_svc.config import AUDIT_BATCH_SIZE, AUDIT_ENABLED, AUDIT_FLUSH_SECONDS, AUDIT_QUEUE_MAX
+from ta_user_svc.models.queries import insert_audit_events
+
+
+class AuditLog:
+    """Write-behind audit trail: routers enqueue events, a lifespan task inserts them in batches.
+
+    ``record`` is a deque append, so it adds no I/O to the request. The queue is bounded; when
+    the database falls behind, new events are dropped and counted in ``dropped`` rather than
+    slowing logins down. A batch is written once ``batch_size`` events are queued or
+    ``flush_interval`` seconds have passed, and whatever is left is written on shutdown.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float, enabled: bool = True):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self._queue: deque = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def record(self, event: str, email: Optional[str] = None, client_ip: Optional[str] = None, detail: Optional[str] = None) -> None:
+        """Queues one event; call from the event loop."""
+        if not self.enabled:
+            return
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.append((time.time(), event, email, client_ip, detail))
+        if self._wakeup is not None and len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self, session_factory) -> int:
+        """Writes queued events in ``batch_size`` batches; returns how many were written.
+
+        Stops at the first failed batch (its events are counted in ``failed``) and leaves the
+        rest queued for the next attempt, so an unavailable database is not hammered.
+        """
+        written = 0
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            rows = [
+                {"occurred_at": datetime.utcfromtimestamp(ts), "event": event, "email": email, "client_ip": client_ip, "detail": detail}
+                for ts, event, email, client_ip, detail in batch
+            ]
+            try:
+                async with session_factory() as db:
+                    await insert_audit_events(db, rows)
+            except Exception as e:
+                self.failed += len(batch)
+                logging.error(e, exc_info=True)
+                break
+            written += len(batch)
+        self.written += written
+        return written
+
+    async def run(self, session_factory) -> None:
+        """Flushes on a full batch or every ``flush_interval``; runs as a lifespan task until cancelled.
+
+        Cancellation drains the queue before the task ends, so a graceful shutdown loses nothing.
+        """
+        self._wakeup = asyncio.Event()  # bound to this loop; record() only signals once it exists
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush(session_factory)
+        finally:
+            self._wakeup = None
+            await self.flush(session_factory)
+
+    def clear(self) -> None:
+        self._queue.clear()
+
+
+audit_log = AuditLog(AUDIT_QUEUE_MAX, AUDIT_BATCH_SIZE, AUDIT_FLUSH_SECONDS, enabled=AUDIT_ENABLED)
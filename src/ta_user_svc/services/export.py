@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterable, AsyncIterator, Iterable, Sequence
+
+# Columns exported by default. The password hash is only added on explicit request (CLI backups).
+EXPORT_COLUMNS = ["email", "nickname", "role", "approved"]
+BACKUP_COLUMNS = EXPORT_COLUMNS + ["passhash"]
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def ndjson_chunk(columns: Sequence[str], rows: Iterable[Sequence]) -> bytes:
+    return "".join(json.dumps(dict(zip(columns, row))) + "\n" for row in rows).encode()
+
+
+def csv_chunk(rows: Iterable[Sequence]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+async def export_chunks(partitions: AsyncIterable[Sequence], columns: Sequence[str], fmt: str, compress: bool = False) -> AsyncIterator[bytes]:
+    """Encodes row batches as NDJSON or CSV (with a header row), optionally gzip-compressed.
+
+    Each batch becomes one chunk and is then dropped, so memory stays flat however many rows
+    pass through. Gzip is streamed too: the compressor only keeps its window between chunks.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+
+    def encode(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    if fmt == "csv":
+        yield encode(csv_chunk([columns]))
+    async for rows in partitions:
+        chunk = encode(csv_chunk(rows) if fmt == "csv" else ndjson_chunk(columns, rows))
+        if chunk:
+            yield chunk
+    if compressor:
+        yield compressor.flush()
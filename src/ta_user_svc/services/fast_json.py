@@ -0,0 +1,23 @@
+"""Compact JSON for responses and token payloads: orjson when installed, the stdlib otherwise.
+
+orjson is an optional dependency (``pip install ta_user_svc[fast]``); without it the service
+behaves the same, only slower to serialize.
+"""
+import json
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    dumps = orjson.dumps
+    JSONResponseClass = ORJSONResponse
+else:
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    JSONResponseClass = JSONResponse
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Optional
+
+from ta_user_svc.config import INTROSPECT_BATCH_WINDOW, INTROSPECT_MAX_TOKENS
+from ta_user_svc.models.queries import DbSession, get_user_statuses
+
+
+class _Batch:
+    def __init__(self):
+        self.emails: set[str] = set()
+        self.task: Optional[asyncio.Future] = None
+
+
+class UserStatusBatcher:
+    """Merges the user lookups of concurrent introspection requests into shared IN queries.
+
+    The first request to ask opens a batch and, after ``window`` seconds, runs one query for every
+    email added to it meanwhile, on its own session; the requests that joined wait for that
+    result. A batch that would grow past ``max_emails`` is left to run and a new one is opened.
+    The query runs as its own task, so a leader that goes away does not fail the others.
+    ``queries`` and ``lookups`` count queries run and requests served.
+    """
+
+    def __init__(self, window: float, max_emails: int):
+        self.window = window
+        self.max_emails = max_emails
+        self.queries = 0
+        self.lookups = 0
+        self._batch: Optional[_Batch] = None
+
+    async def _run(self, db: DbSession, batch: _Batch) -> dict:
+        await asyncio.sleep(self.window)
+        if self._batch is batch:
+            self._batch = None
+        self.queries += 1
+        return await get_user_statuses(db, list(batch.emails))
+
+    async def lookup(self, db: DbSession, emails: set[str]) -> dict[str, tuple[bool, str]]:
+        """``(approved, role)`` for each registered email in ``emails`` (normalized), via a shared batch."""
+        self.lookups += 1
+        batch = self._batch
+        if batch is None or len(batch.emails | emails) > self.max_emails:
+            batch = self._batch = _Batch()
+            batch.emails |= emails
+            batch.task = asyncio.ensure_future(self._run(db, batch))
+            # Retrieved here in case every caller has gone away.
+            batch.task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        else:
+            batch.emails |= emails
+        statuses = await asyncio.shield(batch.task)
+        return {email: statuses[email] for email in emails if email in statuses}
+
+
+user_status_batcher = UserStatusBatcher(INTROSPECT_BATCH_WINDOW, INTROSPECT_MAX_TOKENS)
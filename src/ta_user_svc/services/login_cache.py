@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+
+from ta_user_svc.config import LOGIN_CACHE_NEGATIVE_TTL, LOGIN_CACHE_SIZE, LOGIN_CACHE_TTL
+
+# Returned by ``LoginCache.get`` when the email has no entry; ``None`` means "known not to exist".
+MISSING = object()
+
+
+class LoginRecord:
+    """The columns login needs, without ORM instance overhead."""
+
+    __slots__ = ("email", "passhash", "approved", "nickname")
+
+    def __init__(self, email: str, passhash: str, approved: bool, nickname: str):
+        self.email = email
+        self.passhash = passhash
+        self.approved = approved
+        self.nickname = nickname
+
+
+class LoginCache:
+    """Bounded LRU/TTL cache of login records, including negative entries for unknown emails.
+
+    Keys are normalized emails (see ``normalize_email``). Writers must call ``invalidate`` after
+    creating a user or changing ``approved``/``role``. Readers capture ``generation`` before
+    querying and pass it to ``put`` so a lookup that raced an invalidation is not cached.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._entries: OrderedDict[str, tuple[float, LoginRecord | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, email: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(email)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[email]
+            self.misses += 1
+            return MISSING
+
+    def put(self, email: str, record: LoginRecord | None, generation: int) -> None:
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if record is not None else self.negative_ttl
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[email] = (time.monotonic() + ttl, record)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email: str) -> None:
+        self.invalidate_many([email])
+
+    def invalidate_many(self, emails) -> None:
+        with self._lock:
+            self.generation += 1
+            for email in emails:
+                self._entries.pop(email, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+login_cache = LoginCache(LOGIN_CACHE_SIZE, LOGIN_CACHE_TTL, LOGIN_CACHE_NEGATIVE_TTL)
@@ -0,0 +1,252 @@
+import bisect
+import threading
+import time
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+
+from ta_user_svc.models.base import current_engine
+from ta_user_svc.services.audit import audit_log
+from ta_user_svc.services.single_flight import login_flight, registration_flight
+
+# Seconds; spans a fast cache hit up to a slow bcrypt call stuck behind a full queue.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in items]
+
+
+class Gauge(Metric):
+    """A gauge whose samples are read from ``collect`` at scrape time, so nothing is recorded per request."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, collect: Callable[[], dict[tuple, float]], labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        return self.header() + [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in sorted(self.collect().items())]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, seconds: float, *labels) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += seconds
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((labels, (list(series[0]), series[1])) for labels, series in self._series.items())
+        lines = self.header()
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.register(Histogram("http_request_duration_seconds", "Request latency by route template.", ("method", "route")))
+RESPONSES = registry.register(Counter("http_responses_total", "Responses by route template and status code.", ("method", "route", "status")))
+HASH_SECONDS = registry.register(Histogram("bcrypt_seconds", "bcrypt time inside the hashing worker.", ("operation",)))
+HASH_QUEUE_SECONDS = registry.register(Histogram("bcrypt_queue_seconds", "Time waiting for a free hashing worker.", ("operation",)))
+JWT_SECONDS = registry.register(Histogram("jwt_seconds", "JWT encode/decode time.", ("operation",)))
+SQL_SECONDS = registry.register(Histogram("db_query_seconds", "SQL statement execution time."))
+POOL_CHECKOUT_SECONDS = registry.register(Histogram("db_pool_checkout_seconds", "Time waiting for a pooled connection."))
+
+
+def observe_hash(operation: str, compute: float, queued: float) -> None:
+    HASH_SECONDS.observe(compute, operation)
+    HASH_QUEUE_SECONDS.observe(queued, operation)
+
+
+def _pool_state() -> dict:
+    engine = current_engine()
+    pool = engine.sync_engine.pool if engine is not None else None
+    samples = {}
+    for state, reader in (("in_use", "checkedout"), ("idle", "checkedin"), ("overflow", "overflow"), ("size", "size")):
+        if hasattr(pool, reader):
+            samples[(state,)] = float(getattr(pool, reader)())
+    return samples
+
+
+POOL_CONNECTIONS = registry.register(Gauge("db_pool_connections", "SQLAlchemy pool occupancy of the primary.", _pool_state, ("state",)))
+
+
+def _audit_state() -> dict:
+    return {
+        ("queued",): float(len(audit_log)),
+        ("written",): float(audit_log.written),
+        ("dropped",): float(audit_log.dropped),
+        ("failed",): float(audit_log.failed),
+    }
+
+
+AUDIT_EVENTS = registry.register(Gauge("audit_events", "Audit events queued now, and written, dropped or failed since start.", _audit_state, ("state",)))
+
+
+def _single_flight_state() -> dict:
+    samples = {}
+    for flight in (login_flight, registration_flight):
+        samples[(flight.name, "executed")] = float(flight.executed)
+        samples[(flight.name, "coalesced")] = float(flight.coalesced)
+    return samples
+
+
+SINGLE_FLIGHT_CALLS = registry.register(Gauge(
+    "single_flight_calls", "Calls since start that ran, or joined an identical call already in flight.", _single_flight_state, ("group", "outcome")
+))
+
+
+def instrument_engine(engine) -> None:
+    """Times SQL statements and pool checkouts on ``engine``; pool occupancy is the primary's."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        SQL_SECONDS.observe(time.perf_counter() - conn.info["metrics_query_start"].pop())
+
+    # The pool has no "before checkout" event, so the wait is measured around raw_connection(),
+    # which every Connection goes through; unlike the pool it survives engine.dispose().
+    raw_connection = sync_engine.raw_connection
+
+    def timed_raw_connection():
+        start = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+    sync_engine.raw_connection = timed_raw_connection
+
+
+_templates: dict[int, str] = {}
+
+
+def route_template(scope) -> str:
+    """The matched route's path template for ``scope``, or ``"unmatched"``."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    if id(endpoint) not in _templates:
+        # Plain Starlette routes (e.g. ASGI endpoints added with add_route) don't set scope["route"].
+        for r in scope["app"].routes:
+            if hasattr(r, "endpoint"):
+                _templates[id(r.endpoint)] = r.path
+    return _templates.get(id(endpoint), "unmatched")
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and status per route template.
+
+    Labels use the matched route's path template rather than the raw URL so series stay bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = route_template(scope)
+            REQUEST_LATENCY.observe(time.perf_counter() - start, scope["method"], route)
+            RESPONSES.inc(scope["method"], route, str(status_code))
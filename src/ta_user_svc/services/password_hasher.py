@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import secrets
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+from passlib.context import CryptContext
+from passlib.hash import argon2
+
+from ta_user_svc.config import (
+    ARGON2_MEMORY_COST,
+    ARGON2_TIME_COST,
+    BCRYPT_ROUNDS,
+    HASH_POOL_WORKERS,
+    HASH_QUEUE_MAX,
+    PASSWORD_SCHEME,
+)
+
+
+def build_context(
+    scheme: str = PASSWORD_SCHEME,
+    bcrypt_rounds: int = BCRYPT_ROUNDS,
+    argon2_time_cost: int = ARGON2_TIME_COST,
+    argon2_memory_cost: int = ARGON2_MEMORY_COST,
+) -> CryptContext:
+    """The service's single hashing policy.
+
+    New hashes use ``scheme`` at the configured cost. Hashes from any other supported scheme,
+    or at another cost, still verify but report ``needs_update`` so login can upgrade them.
+    """
+    schemes = ["bcrypt_sha256", "bcrypt"]
+    settings = {"bcrypt_sha256__rounds": bcrypt_rounds, "bcrypt__rounds": bcrypt_rounds}
+    if argon2.has_backend():
+        schemes.insert(0, "argon2")
+        settings.update(argon2__time_cost=argon2_time_cost, argon2__memory_cost=argon2_memory_cost)
+    if scheme not in schemes:
+        raise ValueError(f"PASSWORD_SCHEME '{scheme}' is not available; argon2 requires argon2-cffi")
+    return CryptContext(schemes=schemes, default=scheme, deprecated="auto", **settings)
+
+
+# Module level so pool workers, which import this module afresh, build the same policy.
+pwd_context = build_context()
+
+
+# How long a bulk hash waits before re-checking a full queue.
+BULK_BACKOFF_SECONDS = 0.05
+
+
+class HasherOverloadedError(Exception):
+    """Raised when the hashing queue is full and a call is rejected without running."""
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, passhash: str) -> bool:
+    return pwd_context.verify(password, passhash)
+
+
+def needs_rehash(passhash: str) -> bool:
+    # Parses the hash string only; cheap enough to call on the event loop.
+    return pwd_context.needs_update(passhash)
+
+
+def _timed(fn, *args):
+    # Runs in the worker, so the elapsed time is pure bcrypt cost without queue wait.
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _warm() -> str:
+    # Loads the default scheme's backend in the worker so the first real call doesn't pay for it.
+    return pwd_context.handler().get_backend()
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop with a bounded number of calls in flight.
+
+    Hashing is CPU-bound, so with ``workers > 0`` calls go to a process pool sized to the
+    host's cores. Once ``max_pending`` calls are queued or running, further calls fail fast
+    with ``HasherOverloadedError`` so callers can shed load instead of piling up.
+
+    ``observer``, when set, is called as ``observer(operation, compute_seconds, queue_seconds)``
+    after every hash/verify, splitting time spent in bcrypt from time waiting for a worker.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self.observer: Callable[[str, float, float], None] | None = None
+        self._executor: Executor | None = None
+        self._dummy_hash: str | None = None
+
+    def _get_executor(self) -> Executor | None:
+        if self.workers <= 0:
+            return None  # default thread executor
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _discard_executor(self, executor: Executor) -> None:
+        # Concurrent callers may all see the same broken pool; only the first replaces it.
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (OOM kill, segfault); replace the pool and retry once.
+            logging.warning("Password hashing pool is broken, restarting it")
+            self._discard_executor(executor)
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+
+    async def _submit(self, operation: str, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HasherOverloadedError("Password hashing queue is full")
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            result, compute = await self._run(_timed, fn, *args)
+        finally:
+            self.pending -= 1
+        if self.observer is not None:
+            self.observer(operation, compute, time.perf_counter() - start - compute)
+        return result
+
+    async def warm_up(self) -> None:
+        """Starts every pool worker up front so the first logins don't queue behind process spawns."""
+        if self.workers <= 0:
+            return
+        await asyncio.gather(*(self._run(_warm) for _ in range(self.workers)))
+
+    async def dummy_hash(self) -> str:
+        """Hash of a random, discarded password under the current policy.
+
+        Verifying against it costs what a real verify costs, so unknown emails take as long to
+        reject as wrong passwords. Computed on first use so startup doesn't pay for it.
+        """
+        if self._dummy_hash is None:
+            self._dummy_hash = await self._submit("hash", _hash, secrets.token_hex(16))
+        return self._dummy_hash
+
+    async def hash(self, password: str) -> str:
+        return await self._submit("hash", _hash, password)
+
+    async def verify(self, password: str, passhash: str) -> bool:
+        return await self._submit("verify", _verify, password, passhash)
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """Hashes a batch as low-priority background work.
+
+        At most half the pool (at least one worker) is used by the batch at any time, every
+        hash takes its own queue slot, and when the queue is full the batch waits instead of
+        being rejected. Interactive hash/verify calls therefore never queue behind more than
+        a few batch hashes and keep their fast-rejection guarantee.
+        """
+        results: list[str | None] = [None] * len(passwords)
+        indexes = iter(range(len(passwords)))
+
+        async def worker():
+            for i in indexes:
+                while self.pending >= self.max_pending:
+                    await asyncio.sleep(BULK_BACKOFF_SECONDS)
+                results[i] = await self._submit("hash", _hash, passwords[i])
+
+        concurrency = min(len(passwords), max(1, self.workers // 2))
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return results
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            try:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+            except Exception as e:
+                logging.error(e, exc_info=True)
+            self._executor = None
+
+    def _after_fork(self) -> None:
+        # A forked child does not own the parent's pool workers or its in-flight accounting.
+        self._executor = None
+        self.pending = 0
+
+
+password_hasher = PasswordHasher(HASH_POOL_WORKERS, HASH_QUEUE_MAX)
+os.register_at_fork(after_in_child=password_hasher._after_fork)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
+
+
+async def verify_password(password: str, passhash: str) -> bool:
+    return await password_hasher.verify(password, passhash)
+
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    return await password_hasher.hash_many(passwords)
@@ -0,0 +1,195 @@
+import contextvars
+import cProfile
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import event
+
+from ta_user_svc.config import (
+    PROFILE_DIR,
+    PROFILE_KEEP,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_TOP_N,
+    PROFILING_ENABLED,
+    QUERY_BUDGET,
+)
+from ta_user_svc.services.metrics import route_template
+
+STACK_DEPTH = 6
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Set for the duration of a request; threadpool calls inherit the context, so sync sessions count too.
+current_query_stats: contextvars.ContextVar[QueryStats | None] = contextvars.ContextVar("current_query_stats", default=None)
+
+
+def instrument_engine(engine) -> None:
+    """Counts statements and SQL time against the request that issued them."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_query_stats.get() is not None:
+            conn.info.setdefault("profiling_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_query_stats.get()
+        if stats is not None and conn.info.get("profiling_query_start"):
+            stats.count += 1
+            stats.seconds += time.perf_counter() - conn.info["profiling_query_start"].pop()
+
+
+def _label(func: tuple) -> str:
+    filename, line, name = func
+    return f"{os.path.basename(filename)}:{line}({name})" if line else name
+
+
+class StackAggregate:
+    """Per route, the functions with the most cumulative time across profiled requests.
+
+    Each entry carries its heaviest caller chain, so the view reads as a call stack.
+    """
+
+    def __init__(self, top_n: int):
+        self.top_n = top_n
+        self._routes: dict[str, dict[tuple, list]] = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def add(self, route: str, stats: pstats.Stats) -> None:
+        entries = stats.stats  # func -> (cc, nc, tt, ct, callers)
+        top = sorted(entries.items(), key=lambda item: item[1][3], reverse=True)[: self.top_n]
+        with self._lock:
+            stacks = self._routes[route]
+            for func, (_, _, _, cumulative, _) in top:
+                stack = tuple(self._heaviest_path(entries, func))
+                entry = stacks.setdefault(stack, [0.0, 0])
+                entry[0] += cumulative
+                entry[1] += 1
+
+    @staticmethod
+    def _heaviest_path(entries: dict, func: tuple) -> list[str]:
+        path = [_label(func)]
+        seen = {func}
+        while len(path) < STACK_DEPTH:
+            callers = entries.get(func, (0, 0, 0, 0, {}))[4]
+            candidates = [caller for caller in callers if caller not in seen]
+            if not candidates:
+                break
+            func = max(candidates, key=lambda caller: entries.get(caller, (0, 0, 0, 0))[3])
+            seen.add(func)
+            path.append(_label(func))
+        return path[::-1]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                route: [
+                    {"stack": list(stack), "cumulative_ms": round(total * 1000, 3), "samples": samples}
+                    for stack, (total, samples) in sorted(stacks.items(), key=lambda item: item[1][0], reverse=True)[: self.top_n]
+                ]
+                for route, stacks in self._routes.items()
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+class ProfileWriter:
+    """Writes ``.prof`` files to ``directory`` and deletes the oldest beyond ``keep``."""
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def write(self, profile: cProfile.Profile, method: str, route: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        path = os.path.join(self.directory, f"{time.time_ns()}-{method.lower()}-{slug}.prof")
+        profile.dump_stats(path)
+        with self._lock:
+            files = sorted(name for name in os.listdir(self.directory) if name.endswith(".prof"))
+            for name in files[: max(len(files) - self.keep, 0)]:
+                os.remove(os.path.join(self.directory, name))
+        return path
+
+
+class ProfilingMiddleware:
+    """Opt-in per-request profiling and SQL accounting (``PROFILING_ENABLED``).
+
+    Every request gets ``X-Query-Count`` / ``X-Query-Time-Ms`` headers and a warning when it
+    runs more than ``QUERY_BUDGET`` statements. Requests sent with ``X-Profile: 1``, plus a
+    ``PROFILE_SAMPLE_RATE`` fraction of the rest, run under cProfile. cProfile sees everything
+    on the event loop thread, so concurrent requests can bleed into a profile; bcrypt runs in
+    worker processes and shows up only as awaiting time.
+    """
+
+    def __init__(self, app, enabled: bool = PROFILING_ENABLED, sample_rate: float = PROFILE_SAMPLE_RATE, query_budget: int = QUERY_BUDGET):
+        self.app = app
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.query_budget = query_budget
+
+    def _wants_profile(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return value in (b"1", b"true")
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-query-count", str(stats.count).encode()),
+                    (b"x-query-time-ms", f"{stats.seconds * 1000:.3f}".encode()),
+                ]
+            await send(message)
+
+        profile = cProfile.Profile() if self._wants_profile(scope) else None
+        try:
+            if profile is None:
+                await self.app(scope, receive, send_wrapper)
+            else:
+                profile.enable()
+                try:
+                    await self.app(scope, receive, send_wrapper)
+                finally:
+                    profile.disable()
+        finally:
+            current_query_stats.reset(token)
+            route = route_template(scope)
+            if stats.count > self.query_budget:
+                logging.warning(f"{scope['method']} {route} ran {stats.count} SQL statements (budget {self.query_budget})")
+            if profile is not None:
+                try:
+                    profile_writer.write(profile, scope["method"], route)
+                    stack_aggregate.add(route, pstats.Stats(profile))
+                except Exception as e:
+                    logging.error(e, exc_info=True)
+
+
+stack_aggregate = StackAggregate(PROFILE_TOP_N)
+profile_writer = ProfileWriter(PROFILE_DIR, PROFILE_KEEP)
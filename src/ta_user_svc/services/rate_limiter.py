@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import math
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from starlette.concurrency import run_in_threadpool
+
+from ta_user_svc.config import (
+    LOGIN_EMAIL_BURST,
+    LOGIN_EMAIL_RATE,
+    LOGIN_IP_BURST,
+    LOGIN_IP_RATE,
+    RATE_LIMIT_DB_PATH,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_SHARDS,
+    REFRESH_IP_BURST,
+    REFRESH_IP_RATE,
+)
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+
+class Limit:
+    """Token bucket parameters: ``burst`` requests at once, refilled at ``rate`` per second."""
+
+    __slots__ = ("name", "rate", "burst")
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+
+
+def _take(tokens: float | None, updated: float, limit: Limit, now: float) -> tuple[float, float]:
+    """Refills a bucket and tries to take one token; returns ``(tokens_left, wait_seconds)``."""
+    if tokens is None:
+        tokens = float(limit.burst)
+    else:
+        tokens = min(float(limit.burst), tokens + (now - updated) * limit.rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / limit.rate
+
+
+def _full_at(tokens: float, limit: Limit, now: float) -> float:
+    # From this moment a missing bucket and this one behave the same, so it can be evicted.
+    return now + (limit.burst - tokens) / limit.rate
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets. ``blocking`` backends are called off the event loop."""
+
+    blocking = False
+
+    @abstractmethod
+    def take(self, key: str, limit: Limit, now: float) -> float:
+        """Takes one token from ``key``'s bucket; returns 0 if allowed, else seconds to wait."""
+
+    @abstractmethod
+    def sweep(self, now: float) -> int:
+        """Evicts buckets that have refilled completely; returns how many were dropped."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Buckets in ``shards`` dicts, each behind its own lock, so concurrent keys rarely contend."""
+
+    def __init__(self, shards: int):
+        self._shards = [({}, threading.Lock()) for _ in range(max(shards, 1))]
+
+    def _shard(self, key: str):
+        return self._shards[hash(key) % len(self._shards)]
+
+    def take(self, key: str, limit: Limit, now: float) -> float:
+        buckets, lock = self._shard(key)
+        with lock:
+            state = buckets.get(key)
+            tokens, wait = _take(state[0] if state else None, state[1] if state else now, limit, now)
+            buckets[key] = (tokens, now, _full_at(tokens, limit, now))
+        return wait
+
+    def sweep(self, now: float) -> int:
+        dropped = 0
+        for buckets, lock in self._shards:
+            with lock:
+                idle = [key for key, state in buckets.items() if state[2] <= now]
+                for key in idle:
+                    del buckets[key]
+            dropped += len(idle)
+        return dropped
+
+    def clear(self) -> None:
+        for buckets, lock in self._shards:
+            with lock:
+                buckets.clear()
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for buckets, _ in self._shards)
+
+
+class SqliteRateLimitBackend(RateLimitBackend):
+    """Buckets in a local SQLite file so every worker process on the host shares the same limits.
+
+    Each take is one short ``BEGIN IMMEDIATE`` transaction; SQLite serialises writers across
+    processes. A stand-in for a shared store such as Redis.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, limit: Limit, now: float) -> float:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+            tokens, wait = _take(row[0] if row else None, row[1] if row else now, limit, now)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)",
+                (key, tokens, now, _full_at(tokens, limit, now)),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def sweep(self, now: float) -> int:
+        return self._conn().execute("DELETE FROM rate_buckets WHERE full_at <= ?", (now,)).rowcount
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM rate_buckets")
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.rejected = 0
+
+    def check(self, *hits: tuple[Limit, str]) -> None:
+        """Takes a token for every ``(limit, key)`` pair; raises ``RateLimitExceeded`` if any is empty."""
+        if not self.enabled:
+            return
+        now = time.time()
+        wait = max(self.backend.take(f"{limit.name}:{key}", limit, now) for limit, key in hits)
+        if wait > 0:
+            self.rejected += 1
+            raise RateLimitExceeded(wait)
+
+    async def check_async(self, *hits: tuple[Limit, str]) -> None:
+        if self.backend.blocking:
+            await run_in_threadpool(self.check, *hits)
+        else:
+            self.check(*hits)
+
+    async def sweep_forever(self, interval: float) -> None:
+        """Periodically evicts idle buckets; runs as a lifespan task until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if self.backend.blocking:
+                    await run_in_threadpool(self.backend.sweep, time.time())
+                else:
+                    self.backend.sweep(time.time())
+            except Exception as e:
+                logging.error(e, exc_info=True)
+
+
+def retry_after_header(e: RateLimitExceeded) -> dict:
+    return {"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+
+
+LOGIN_PER_IP = Limit("login-ip", LOGIN_IP_RATE, LOGIN_IP_BURST)
+LOGIN_PER_EMAIL = Limit("login-email", LOGIN_EMAIL_RATE, LOGIN_EMAIL_BURST)
+REFRESH_PER_IP = Limit("refresh-ip", REFRESH_IP_RATE, REFRESH_IP_BURST)
+
+rate_limiter = RateLimiter(
+    SqliteRateLimitBackend(RATE_LIMIT_DB_PATH) if RATE_LIMIT_DB_PATH else InMemoryRateLimitBackend(RATE_LIMIT_SHARDS),
+    enabled=RATE_LIMIT_ENABLED,
+)
@@ -0,0 +1,114 @@
+import logging
+import math
+import sqlite3
+import threading
+import time
+
+from ta_user_svc.config import REVOCATION_BUCKET_SECONDS, REVOCATION_DB_PATH
+
+
+class SqliteRevocationBackend:
+    """Persists revocations to a local SQLite file so they survive restarts.
+
+    Only written on revoke and read once at startup; the request path never queries it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS revoked_tokens (jti TEXT PRIMARY KEY, exp REAL NOT NULL)")
+
+    def load(self, now: float) -> list[tuple[str, float]]:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM revoked_tokens WHERE exp <= ?", (now,))
+            return self._conn.execute("SELECT jti, exp FROM revoked_tokens").fetchall()
+
+    def add(self, jti: str, exp: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO revoked_tokens (jti, exp) VALUES (?, ?)", (jti, exp))
+
+    def purge(self, now: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM revoked_tokens WHERE exp <= ?", (now,))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class RevocationStore:
+    """Denylist of revoked token ``jti`` values with O(1) membership checks.
+
+    Entries are also filed into a timing wheel of ``bucket_seconds``-wide buckets by their
+    ``exp``. Once a bucket's end has passed, every token in it has expired anyway, so the
+    whole bucket is dropped; memory is bounded by the tokens revoked within the live-token
+    window rather than growing forever.
+    """
+
+    def __init__(self, bucket_seconds: int, backend: SqliteRevocationBackend | None = None):
+        self.bucket_seconds = bucket_seconds
+        self.backend = backend
+        self._revoked: dict[str, float] = {}
+        self._buckets: dict[int, set[str]] = {}
+        self._cursor = math.floor(time.time() / bucket_seconds)
+        self._lock = threading.Lock()
+
+    def _add(self, jti: str, exp: float) -> None:
+        bucket = math.ceil(exp / self.bucket_seconds)
+        self._revoked[jti] = exp
+        self._buckets.setdefault(bucket, set()).add(jti)
+
+    def load(self) -> None:
+        if self.backend is None:
+            return
+        rows = self.backend.load(time.time())
+        with self._lock:
+            for jti, exp in rows:
+                self._add(jti, exp)
+
+    def revoke(self, jti: str, exp: float) -> None:
+        now = time.time()
+        if exp <= now:
+            return  # already expired, nothing to deny
+        with self._lock:
+            self._add(jti, exp)
+        if self.backend is not None:
+            self.backend.add(jti, exp)
+        self.sweep(now)
+
+    def is_revoked(self, jti: str) -> bool:
+        if time.time() >= (self._cursor + 1) * self.bucket_seconds:
+            self.sweep()
+        return jti in self._revoked
+
+    def sweep(self, now: float | None = None) -> None:
+        """Drops every bucket whose end is in the past."""
+        now = time.time() if now is None else now
+        current = math.floor(now / self.bucket_seconds)
+        with self._lock:
+            if current <= self._cursor:
+                return
+            for bucket in range(self._cursor + 1, current + 1):
+                for jti in self._buckets.pop(bucket, ()):
+                    del self._revoked[jti]
+            self._cursor = current
+        if self.backend is not None:
+            try:
+                self.backend.purge(now)
+            except sqlite3.Error as e:
+                logging.error(e, exc_info=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._revoked.clear()
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revocation_store = RevocationStore(
+    REVOCATION_BUCKET_SECONDS,
+    SqliteRevocationBackend(REVOCATION_DB_PATH) if REVOCATION_DB_PATH else None,
+)
@@ -0,0 +1,57 @@
+import asyncio
+import hashlib
+import hmac
+import os
+from typing import Any, Awaitable, Callable, Hashable
+
+# Per-process key: coalescing keys never leave the process, and keying them means the table
+# never holds anything a password could be recovered from.
+_KEY = os.urandom(32)
+
+
+def credentials_key(email: str, password: str) -> bytes:
+    return hmac.new(_KEY, f"{email}\0{password}".encode(), hashlib.sha256).digest()
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key share its outcome.
+
+    The call runs as its own task, so a caller that goes away (client disconnect) does not
+    cancel the work the others are waiting for. ``executed`` and ``coalesced`` count calls
+    that ran and calls that joined one already in flight.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.executed = 0
+        self.coalesced = 0
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def _done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller has gone away
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Returns ``(result, shared)``; ``shared`` is True for callers that joined another's call.
+
+        Exceptions from ``fn`` are raised to every caller.
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+            self.executed += 1
+        return await asyncio.shield(task), shared
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+login_flight = SingleFlight("login")
+registration_flight = SingleFlight("registration")
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+import jwt  # PyJWT
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm, get_default_algorithms
+from jwt.utils import base64url_encode
+
+from ta_user_svc.config import (
+    JWT_ACCEPT_HS256,
+    JWT_ACTIVE_KID,
+    JWT_ALGORITHM,
+    JWT_KEYS_DIR,
+    JWT_SECRET,
+    TOKEN_CACHE_SIZE,
+    TOKEN_CACHE_TTL,
+)
+from ta_user_svc.services.fast_json import dumps
+from ta_user_svc.services.metrics import JWT_SECONDS
+from ta_user_svc.services.revocation import revocation_store
+
+ASYMMETRIC_ALGORITHMS = ("EdDSA", "ES256")
+
+
+def _key_algorithm(key) -> str:
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return "EdDSA"
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)) and isinstance(key.curve, ec.SECP256R1):
+        return "ES256"
+    raise ValueError(f"Unsupported JWT key type {type(key).__name__}; use Ed25519 or EC P-256")
+
+
+def _public_jwk(kid: str, algorithm: str, public_key) -> dict:
+    exporter = OKPAlgorithm if algorithm == "EdDSA" else ECAlgorithm
+    jwk = exporter.to_jwk(public_key, as_dict=True)
+    jwk.update(kid=kid, alg=algorithm, use="sig")
+    return jwk
+
+
+class KeyRing:
+    """Signing and verification keys, parsed once at startup and kept as key objects.
+
+    Asymmetric tokens carry a ``kid`` header naming the key that signed them. Every key in the
+    ring verifies, so rotating means adding the new key, switching ``JWT_ACTIVE_KID`` once
+    consumers have refreshed the JWKS, and deleting the old key after its tokens expire.
+    Kid-less HS256 tokens verify against the shared secret while ``hmac_key`` is set.
+
+    The header never changes for a given algorithm and kid, so its base64url segment is built
+    here once, along with the algorithm object that signs.
+    """
+
+    def __init__(self, algorithm: str, kid: str | None, signing_key, verification_keys: dict, hmac_key=None):
+        self.algorithm = algorithm
+        self.kid = kid
+        self.signing_key = signing_key
+        self.headers = {"kid": kid} if kid else None
+        self.verification_keys = verification_keys  # kid -> (public key, algorithm)
+        self.hmac_key = hmac_key
+        # Same JSON as PyJWT's header (sorted keys, compact), so tokens are byte-identical to jwt.encode.
+        header = {"typ": "JWT", "alg": algorithm, **(self.headers or {})}
+        self.header_segment = base64url_encode(json.dumps(header, separators=(",", ":"), sort_keys=True).encode())
+        if isinstance(signing_key, jwt.PyJWK):
+            self.signer, self.raw_signing_key = signing_key.Algorithm, signing_key.key
+        else:
+            self.signer, self.raw_signing_key = get_default_algorithms()[algorithm], signing_key
+        keys = [_public_jwk(k, alg, public_key) for k, (public_key, alg) in sorted(verification_keys.items())]
+        self.jwks_body = json.dumps({"keys": keys}, separators=(",", ":")).encode()
+        self.etag = '"' + hashlib.sha256(self.jwks_body).hexdigest()[:32] + '"'
+
+    @classmethod
+    def load(cls, algorithm: str, secret: str, keys_dir: str, active_kid: str, accept_hs256: bool) -> "KeyRing":
+        # Prepared once so encode/decode skip PyJWT's per-call key parsing and PEM sniffing.
+        hmac_key = jwt.PyJWK.from_dict({"kty": "oct", "k": base64url_encode(secret.encode()).decode(), "alg": "HS256"})
+        if algorithm == "HS256":
+            return cls("HS256", None, hmac_key, {}, hmac_key)
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise ValueError(f"JWT_ALGORITHM must be HS256, EdDSA or ES256, not '{algorithm}'")
+        if not keys_dir:
+            raise ValueError(f"JWT_ALGORITHM={algorithm} requires JWT_KEYS_DIR")
+
+        private_keys, verification_keys = {}, {}
+        for name in sorted(os.listdir(keys_dir)):
+            if not name.endswith(".pem"):
+                continue
+            kid = name[:-len(".pem")]
+            with open(os.path.join(keys_dir, name), "rb") as f:
+                data = f.read()
+            if b"PRIVATE KEY" in data:
+                private_keys[kid] = load_pem_private_key(data, password=None)
+                public_key = private_keys[kid].public_key()
+            else:
+                public_key = load_pem_public_key(data)
+            verification_keys[kid] = (public_key, _key_algorithm(public_key))
+
+        signing_key = private_keys.get(active_kid)
+        if signing_key is None:
+            raise ValueError(f"JWT_ACTIVE_KID '{active_kid}' has no private key in {keys_dir}")
+        if _key_algorithm(signing_key) != algorithm:
+            raise ValueError(f"Key '{active_kid}' is not an {algorithm} key")
+        return cls(algorithm, active_kid, signing_key, verification_keys, hmac_key if accept_hs256 else None)
+
+    def verification_key(self, token: str) -> tuple:
+        """Picks the key and the single algorithm allowed for ``token`` from its header."""
+        header = jwt.get_unverified_header(token)
+        kid = header.get("kid")
+        if kid is None:
+            if self.hmac_key is None:
+                raise jwt.InvalidTokenError("Token has no key id")
+            return self.hmac_key, "HS256"
+        entry = self.verification_keys.get(kid)
+        if entry is None:
+            raise jwt.InvalidTokenError("Unknown key id")
+        return entry
+
+
+key_ring = KeyRing.load(JWT_ALGORITHM, JWT_SECRET, JWT_KEYS_DIR, JWT_ACTIVE_KID, JWT_ACCEPT_HS256)
+
+
+class TokenRevokedError(jwt.InvalidTokenError):
+    pass
+
+
+def new_jti() -> str:
+    """Unique token id; the handle logout uses to revoke a token."""
+    return secrets.token_hex(16)
+
+
+def encode_token(payload: dict) -> str:
+    """Signs ``payload`` with the active key; claims must be JSON-native (``exp`` an int timestamp).
+
+    Only the payload is serialized per call: the header segment comes prebuilt from the key ring.
+    """
+    start = time.perf_counter()
+    try:
+        signing_input = key_ring.header_segment + b"." + base64url_encode(dumps(payload))
+        signature = key_ring.signer.sign(signing_input, key_ring.raw_signing_key)
+        return (signing_input + b"." + base64url_encode(signature)).decode()
+    finally:
+        JWT_SECONDS.observe(time.perf_counter() - start, "encode")
+
+
+def decode_token(token: str) -> dict:
+    start = time.perf_counter()
+    try:
+        key, algorithm = key_ring.verification_key(token)
+        return jwt.decode(token, key, algorithms=[algorithm])
+    finally:
+        JWT_SECONDS.observe(time.perf_counter() - start, "decode")
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of already-verified token claims, keyed by a SHA-256 digest of the token.
+
+    An entry is trusted for at most ``ttl`` seconds and never past the token's own ``exp``,
+    so a hit is always something ``decode_token`` would still accept. Only successfully
+    verified tokens are stored; the returned claims must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, claims: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        exp = claims.get("exp")
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+token_cache = VerifiedTokenCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+
+
+def decode_token_cached(token: str) -> dict:
+    """Like ``decode_token`` but skips signature verification for recently verified tokens."""
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        token_cache.put(token, claims)
+    return claims
+
+
+def verify_token(token: str) -> dict:
+    """Decodes a token (via the cache) and rejects it if its ``jti`` has been revoked.
+
+    Tokens issued before ``jti`` claims existed carry none and stay valid until they expire.
+    """
+    claims = decode_token_cached(token)
+    jti = claims.get("jti")
+    if jti is not None and revocation_store.is_revoked(jti):
+        raise TokenRevokedError("Token has been revoked")
+    return claims
+
+
+def verify_tokens(tokens: list[str]) -> list[tuple[dict | None, str | None]]:
+    """Verifies each token like ``verify_token``; returns ``(claims, None)`` or ``(None, reason)`` per token.
+
+    ``reason`` is ``expired``, ``revoked`` or ``invalid``. A token repeated in the batch is verified once.
+    """
+    outcomes = {}
+    for token in tokens:
+        if token in outcomes:
+            continue
+        try:
+            outcomes[token] = (verify_token(token), None)
+        except jwt.ExpiredSignatureError:
+            outcomes[token] = (None, "expired")
+        except TokenRevokedError:
+            outcomes[token] = (None, "revoked")
+        except jwt.InvalidTokenError:
+            outcomes[token] = (None, "invalid")
+    return [outcomes[token] for token in tokens]
+
+
+def warm_up() -> None:
+    """Signs and verifies a throwaway token so PyJWT's algorithm tables are built before traffic."""
+    decode_token(encode_token({"sub": "warm-up", "exp": int(time.time()) + 60}))
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from typing import Optional
+
+from ta_user_svc.config import SQLITE_WRITE_BATCH
+from ta_user_svc.models.base import read_router
+from ta_user_svc.models.queries import DbSession, insert_user_if_absent, insert_users_if_absent
+
+
+class GroupCommitWriter:
+    """Funnels single-user inserts through one task that commits them in groups.
+
+    With SQLite only one connection can write at a time, so concurrent registrations would
+    otherwise queue on the database lock one transaction each. Here they queue in memory
+    instead, and every pass of the writer inserts up to ``max_batch`` of them in a single
+    transaction: one lock acquisition and one commit for the whole group.
+    """
+
+    def __init__(self, max_batch: int):
+        self.max_batch = max_batch
+        self.batches = 0
+        self.rows = 0
+        self._queue: Optional[asyncio.Queue] = None
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    async def insert_user(self, values: dict) -> bool:
+        """Queues one insert and waits for its group to commit; False if the email was taken."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((values, future))
+        return await future
+
+    async def _write(self, session_factory, batch: list) -> None:
+        try:
+            async with session_factory() as db:
+                results = await insert_users_if_absent(db, [values for values, _ in batch])
+        except Exception as e:
+            logging.error(e, exc_info=True)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(batch)
+        for (_, future), inserted in zip(batch, results):
+            if not future.done():
+                future.set_result(inserted)
+
+    async def run(self, session_factory) -> None:
+        """Writes queued inserts until cancelled; runs as a lifespan task.
+
+        On cancellation the group being written is finished and anything still queued is
+        written too, so no caller is left waiting.
+        """
+        queue = self._queue = asyncio.Queue()
+        try:
+            while True:
+                batch = [await queue.get()]
+                while len(batch) < self.max_batch and not queue.empty():
+                    batch.append(queue.get_nowait())
+                await asyncio.shield(self._write(session_factory, batch))
+        finally:
+            self._queue = None
+            while not queue.empty():
+                batch = [queue.get_nowait() for _ in range(min(self.max_batch, queue.qsize()))]
+                await self._write(session_factory, batch)
+
+
+user_writer = GroupCommitWriter(SQLITE_WRITE_BATCH)
+
+
+async def insert_user(db: DbSession, values: dict) -> bool:
+    """Inserts one user through the group-commit writer when it runs, else directly on ``db``.
+
+    The writer commits on its own session, so the requesting client is pinned here instead.
+    """
+    if not user_writer.running:
+        return await insert_user_if_absent(db, values)
+    inserted = await user_writer.insert_user(values)
+    if inserted:
+        read_router.pin(db.info.get("client"))
+    return inserted
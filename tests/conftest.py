@@ -1,10 +1,18 @@
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import StaticPool, create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from ta_user_svc.app import app
 from ta_user_svc.models.base import Base, get_db
+from ta_user_svc.services.audit import audit_log
+from ta_user_svc.services.login_cache import login_cache
+from ta_user_svc.services.rate_limiter import rate_limiter
+from ta_user_svc.services.revocation import revocation_store
+from ta_user_svc.services.tokens import token_cache
 
 
 # DO NOT MODIFY SECTION START
@@ -39,4 +47,34 @@ def client(session_local):
     with TestClient(app) as c:
         yield c
     app.dependency_overrides[get_db] = get_db
-# DO NOT MODIFY SECTION END
\ No newline at end of file
+# DO NOT MODIFY SECTION END
+
+
+@pytest.fixture
+def async_session_local(tmp_path):
+    """Async session factory over a file-backed aiosqlite database with the schema created."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+
+    async def init():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+    asyncio.run(init())
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
+
+
+@pytest.fixture(autouse=True)
+def reset_service_state(monkeypatch):
+    """Clears process-wide caches so state never leaks between tests.
+
+    The audit log is off unless a test turns it on: the app's flusher writes through the default
+    engine, which has no tables here.
+    """
+    login_cache.clear()
+    token_cache.clear()
+    revocation_store.clear()
+    rate_limiter.backend.clear()
+    audit_log.clear()
+    monkeypatch.setattr(audit_log, "enabled", False)
+    yield
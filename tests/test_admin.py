@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from passlib.context import CryptContext
+from sqlalchemy import event
+
+from ta_user_svc.models.user import User
+from ta_user_svc.routers import admin
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+PASSWORD = "password123"
+PASSHASH = pwd_context.hash(PASSWORD)
+
+
+def add_users(db_session, emails, approved=False, role="user"):
+    for email in emails:
+        db_session.add(User(email=email, passhash=PASSHASH, nickname="nick", role=role, approved=approved))
+    db_session.commit()
+
+
+def login(client, email):
+    return client.post("/api/login", json={"email": email, "password": PASSWORD})
+
+
+@pytest.fixture
+def admin_headers(client, db_session):
+    add_users(db_session, ["admin@example.com"], approved=True, role="admin")
+    token = login(client, "admin@example.com").json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_requires_admin_role(client, db_session):
+    assert client.get("/api/admin/users/pending").status_code == status.HTTP_401_UNAUTHORIZED
+    add_users(db_session, ["plain@example.com"], approved=True)
+    token = login(client, "plain@example.com").json()["access_token"]
+    response = client.get("/api/admin/users/pending", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_pending_users_keyset_pages(client, db_session, admin_headers):
+    pending = [f"user{i}@example.com" for i in range(5)]
+    add_users(db_session, reversed(pending))
+    add_users(db_session, ["approved@example.com"], approved=True)
+
+    seen, after = [], None
+    while True:
+        params = {"limit": 2} if after is None else {"limit": 2, "after": after}
+        page = client.get("/api/admin/users/pending", params=params, headers=admin_headers).json()
+        seen += [user["email"] for user in page["users"]]
+        after = page["next_after"]
+        if after is None:
+            break
+    assert seen == pending
+
+
+def test_pending_query_uses_partial_index(client, db_session, session_local, admin_headers):
+    engine = session_local.kw["bind"]
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "ORDER BY users.email" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        client.get("/api/admin/users/pending", params={"after": "a"}, headers=admin_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    (statement, parameters), = statements
+    with engine.connect() as conn:
+        plan = " ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+    assert "ix_users_pending" in plan
+
+
+def test_bulk_approve_by_list_invalidates_login_cache(client, db_session, admin_headers):
+    add_users(db_session, ["a@example.com", "b@example.com", "c@example.com"])
+    # Caches the unapproved record.
+    assert login(client, "a@example.com").status_code == status.HTTP_403_FORBIDDEN
+
+    response = client.post(
+        "/api/admin/users/approve",
+        json={"emails": ["A@Example.com", "b@example.com", "missing@example.com", "admin@example.com"]},
+        headers=admin_headers,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"affected": 2}
+    assert login(client, "a@example.com").status_code == status.HTTP_200_OK
+    assert login(client, "c@example.com").status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_bulk_reject_by_domain(client, db_session, admin_headers):
+    add_users(db_session, ["x@spam.test", "y@spam.test", "z@example.com"])
+    add_users(db_session, ["kept@spam.test"], approved=True)
+
+    response = client.post("/api/admin/users/reject", json={"email_domain": "Spam.test"}, headers=admin_headers)
+    assert response.json() == {"affected": 2}
+    remaining = {user.email for user in db_session.query(User).all()}
+    assert remaining == {"admin@example.com", "z@example.com", "kept@spam.test"}
+
+
+def test_bulk_decision_needs_exactly_one_selector(client, admin_headers):
+    body = {"emails": ["a@example.com"], "email_domain": "example.com"}
+    response = client.post("/api/admin/users/approve", json=body, headers=admin_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    response = client.post("/api/admin/users/approve", json={}, headers=admin_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_export_streams_csv(client, db_session, admin_headers, async_session_local, monkeypatch):
+    async def seed():
+        async with async_session_local() as db:
+            db.add_all([User(email=f"e{i}@example.com", passhash="h", nickname=f"nick{i}", approved=i == 0) for i in range(3)])
+            await db.commit()
+
+    asyncio.run(seed())
+    monkeypatch.setattr(admin, "SessionLocal", async_session_local)
+    monkeypatch.setattr(admin, "EXPORT_BATCH_SIZE", 2)
+
+    response = client.get("/api/admin/users/export", params={"format": "csv", "approved": "false"}, headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines() == [
+        "email,nickname,role,approved",
+        "e1@example.com,nick1,user,False",
+        "e2@example.com,nick2,user,False",
+    ]
+    assert "passhash" not in response.text
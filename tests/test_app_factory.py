@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from ta_user_svc.app import create_app
+from ta_user_svc.config import Settings
+from ta_user_svc.models import base
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def test_import_is_lazy():
+    code = (
+        "import sys, ta_user_svc.app, ta_user_svc.models.base as base\n"
+        "assert base._engine is None\n"
+        "for name in ('passlib', 'jwt', 'ta_user_svc.routers.user_login'):\n"
+        "    assert name not in sys.modules, name\n"
+    )
+    subprocess.run([sys.executable, "-c", code], env=dict(os.environ, PYTHONPATH=SRC), check=True)
+
+
+def test_engine_created_in_lifespan_and_disposed(tmp_path, monkeypatch):
+    monkeypatch.setattr(base, "_database_url", base._database_url)
+    app = create_app(Settings(database_url=f"sqlite:///{tmp_path / 'app.db'}", warm_up=False))
+    assert base._engine is None
+    with TestClient(app) as client:
+        assert base._engine is not None
+        assert str(base._engine.url) == f"sqlite+aiosqlite:///{tmp_path / 'app.db'}"
+        assert client.get("/metrics").status_code == 200
+    assert base._engine is None
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+from ta_user_svc.app import app
+from ta_user_svc.models.base import engine_options, get_db, to_async_url
+from ta_user_svc.models.queries import add_user, get_user_by_email
+from ta_user_svc.models.user import User
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+@pytest.fixture
+def async_client(async_session_local):
+    async def override_session():
+        async with async_session_local() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_session
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.pop(get_db, None)
+
+
+def test_to_async_url():
+    assert to_async_url("sqlite:///:memory:") == "sqlite+aiosqlite:///:memory:"
+    assert to_async_url("sqlite+pysqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+    assert to_async_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+    assert to_async_url("postgresql+asyncpg://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+
+
+@pytest.mark.parametrize("url", ["postgresql://u:p@db/app", "postgresql+psycopg2://u:p@db/app", "mysql+pymysql://u:p@db/app"])
+def test_to_async_url_rejects_sync_drivers(url):
+    with pytest.raises(ValueError, match="synchronous driver"):
+        to_async_url(url)
+
+
+def test_engine_options_skip_pool_for_memory_sqlite():
+    assert engine_options("sqlite:///:memory:") == {}
+    options = engine_options("postgresql://u:p@db/app")
+    assert {"pool_size", "max_overflow", "pool_pre_ping", "pool_recycle"} <= options.keys()
+
+
+def test_async_queries(async_session_local):
+    async def run():
+        async with async_session_local() as session:
+            await add_user(session, User(email="a@example.com", passhash="x", nickname="alice"))
+        async with async_session_local() as session:
+            user = await get_user_by_email(session, "a@example.com")
+            missing = await get_user_by_email(session, "b@example.com")
+        return user, missing
+
+    user, missing = asyncio.run(run())
+    assert user.nickname == "alice"
+    assert user.approved is False
+    assert missing is None
+
+
+def test_register_with_async_session(async_client, async_session_local):
+    payload = {"email": "async@example.com", "password": "Password1", "nickname": "async_nick"}
+    assert async_client.post("/api/register", json=payload).status_code == status.HTTP_201_CREATED
+    assert async_client.post("/api/register", json=payload).status_code == status.HTTP_409_CONFLICT
+
+
+def test_login_with_async_session(async_client, async_session_local):
+    async def seed():
+        async with async_session_local() as session:
+            user = User(email="login@example.com", passhash=pwd_context.hash("password123"), nickname="Tester", approved=True)
+            await add_user(session, user)
+
+    asyncio.run(seed())
+    response = async_client.post("/api/login", json={"email": "login@example.com", "password": "password123"})
+    assert response.status_code == status.HTTP_200_OK
+    assert "access_token" in response.json()
+
+
+def test_add_user_conflict_rolls_back(async_session_local):
+    from sqlalchemy.exc import IntegrityError
+
+    async def run():
+        async with async_session_local() as session:
+            await add_user(session, User(email="dup@example.com", passhash="x", nickname="first"))
+            with pytest.raises(IntegrityError):
+                await add_user(session, User(email="dup@example.com", passhash="y", nickname="second"))
+            # The session is usable again after the rollback.
+            return await get_user_by_email(session, "dup@example.com")
+
+    assert asyncio.run(run()).nickname == "first"
+
+
+def test_register_race_maps_to_409(async_client, monkeypatch):
+    from ta_user_svc.routers import user_registration
+
+    payload = {"email": "race@example.com", "password": "Password1", "nickname": "race_nick"}
+    assert async_client.post("/api/register", json=payload).status_code == status.HTTP_201_CREATED
+
+    async def not_found(db, email):
+        return None
+
+    # Simulate losing the race: the duplicate check passes but the INSERT conflicts.
+    monkeypatch.setattr(user_registration, "get_user_by_email", not_found)
+    assert async_client.post("/api/register", json=payload).status_code == status.HTTP_409_CONFLICT
@@ -0,0 +1,110 @@
+import asyncio
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy import select
+
+from ta_user_svc import app as app_module
+from ta_user_svc.app import app
+from ta_user_svc.models.audit import AuditEvent
+from ta_user_svc.models.base import get_db
+from ta_user_svc.models.user import User
+from ta_user_svc.services.audit import AuditLog, audit_log
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def stored_events(session_local):
+    async def run():
+        async with session_local() as db:
+            result = await db.execute(select(AuditEvent.event, AuditEvent.email, AuditEvent.detail).order_by(AuditEvent.id))
+            return [tuple(row) for row in result]
+    return asyncio.run(run())
+
+
+def test_full_queue_drops_and_counts():
+    log = AuditLog(max_queue=2, batch_size=10, flush_interval=1)
+    for _ in range(5):
+        log.record("login_failed", "a@example.com")
+    assert len(log) == 2
+    assert log.dropped == 3
+
+
+def test_flush_writes_in_batches(async_session_local):
+    log = AuditLog(max_queue=100, batch_size=2, flush_interval=1)
+    for i in range(5):
+        log.record("registered", f"u{i}@example.com", "127.0.0.1")
+
+    assert asyncio.run(log.flush(async_session_local)) == 5
+    assert len(log) == 0
+    assert [email for _, email, _ in stored_events(async_session_local)] == [f"u{i}@example.com" for i in range(5)]
+
+
+def test_failed_flush_keeps_the_rest_queued(async_session_local):
+    log = AuditLog(max_queue=100, batch_size=2, flush_interval=1)
+    for i in range(3):
+        log.record("registered", f"u{i}@example.com")
+
+    def broken_session():
+        raise RuntimeError("database down")
+
+    assert asyncio.run(log.flush(broken_session)) == 0
+    assert (log.failed, len(log)) == (2, 1)
+
+
+def test_flusher_writes_on_full_batch_and_drains_on_cancel(async_session_local):
+    log = AuditLog(max_queue=100, batch_size=2, flush_interval=60)
+
+    async def run():
+        flusher = asyncio.create_task(log.run(async_session_local))
+        await asyncio.sleep(0)
+        log.record("registered", "a@example.com")
+        log.record("registered", "b@example.com")  # completes a batch: written without waiting
+        for _ in range(100):
+            if log.written:
+                break
+            await asyncio.sleep(0.01)
+        written_by_size = log.written
+        log.record("registered", "c@example.com")
+        flusher.cancel()
+        await asyncio.gather(flusher, return_exceptions=True)
+        return written_by_size
+
+    assert asyncio.run(run()) == 2
+    assert log.written == 3
+    assert len(stored_events(async_session_local)) == 3
+
+
+def test_login_and_registration_are_audited(async_session_local, monkeypatch):
+    async def seed():
+        async with async_session_local() as db:
+            db.add(User(email="Known@example.com", passhash=pwd_context.hash("password123"), nickname="Tester", approved=True))
+            await db.commit()
+
+    async def override_get_db():
+        async with async_session_local() as session:
+            yield session
+
+    asyncio.run(seed())
+    monkeypatch.setattr(audit_log, "enabled", True)
+    monkeypatch.setattr(app_module, "SessionLocal", async_session_local)
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with TestClient(app) as client:
+            client.post("/api/login", json={"email": "known@example.com", "password": "password123"})
+            client.post("/api/login", json={"email": "known@example.com", "password": "wrong-password"})
+            client.post("/api/login", json={"email": "nobody@example.com", "password": "password123"})
+            response = client.post("/api/register", json={"email": "new@example.com", "password": "Password1", "nickname": "newbie"})
+            assert response.status_code == status.HTTP_201_CREATED
+    finally:
+        del app.dependency_overrides[get_db]
+
+    # Whatever the flusher had not written yet was drained by the lifespan shutdown.
+    assert len(audit_log) == 0
+    assert stored_events(async_session_local) == [
+        ("login_succeeded", "known@example.com", None),
+        ("login_failed", "known@example.com", "bad_password"),
+        ("login_failed", "nobody@example.com", "unknown_user"),
+        ("registered", "new@example.com", None),
+    ]
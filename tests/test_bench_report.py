@@ -0,0 +1,48 @@
+from benchmarks.report import compare, percentile, summarize
+
+
+def _results(p99, rps=100.0, errors=0):
+    return {"modes": {"inprocess": {"login": {"requests": 100, "errors": errors, "rps": rps, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": p99}}}}
+
+
+def test_percentile_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile([], 99) == 0.0
+
+
+def test_summarize():
+    stats = summarize([0.01] * 10, errors=2, elapsed=0.5)
+    assert stats["requests"] == 12
+    assert stats["rps"] == 20.0
+    assert stats["p99_ms"] == 10.0
+
+
+def test_compare_flags_p99_regression():
+    regressions = compare(_results(p99=40.0), _results(p99=30.0), tolerance=0.25)
+    assert regressions == ["inprocess login p99_ms: 40.0 > baseline 30.0"]
+
+
+def test_compare_within_tolerance():
+    assert compare(_results(p99=36.0, rps=80.0), _results(p99=30.0), tolerance=0.25) == []
+
+
+def test_compare_flags_throughput_and_errors():
+    regressions = compare(_results(p99=30.0, rps=50.0, errors=3), _results(p99=30.0), tolerance=0.25)
+    assert len(regressions) == 2
+
+
+def test_parse_importtime_sums_top_level_imports():
+    from benchmarks.startup import parse_importtime
+
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |   encodings.utf_8",
+        "import time:       200 |        500 | site",
+        "import time:        50 |         50 |     json.decoder",
+        "import time:       300 |        350 |   json",
+    ])
+    modules, total = parse_importtime(stderr)
+    assert modules["json"] == (300, 350)
+    assert total == 500
@@ -0,0 +1,137 @@
+import asyncio
+import json
+
+from fastapi import status
+from sqlalchemy import func, select
+
+from ta_user_svc.models.user import User
+from ta_user_svc.routers import user_registration
+from ta_user_svc.services.password_hasher import PasswordHasher
+
+
+def _user(i, **overrides):
+    user = {"email": f"bulk{i}@example.com", "password": "Password1", "nickname": f"bulk_{i}"}
+    user.update(overrides)
+    return user
+
+
+def test_bulk_registration_per_item_results(client, db_session):
+    db_session.add(User(email="taken@example.com", passhash="x", nickname="taken"))
+    db_session.commit()
+
+    users = [
+        _user(1),
+        _user(2, password="short"),
+        _user(3, email="taken@example.com"),
+        _user(4, email="bulk1@example.com"),
+        _user(5, nickname="bad*nick"),
+        "not an object",
+        {"email": "bulk7@example.com"},
+        _user(8),
+    ]
+    response = client.post("/api/register/bulk", json={"users": users})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    data = response.json()
+    assert data["created"] == 2
+    assert [r["status"] for r in data["results"]] == [
+        "created", "invalid", "duplicate", "duplicate", "invalid", "invalid", "invalid", "created",
+    ]
+    assert data["results"][1]["detail"] == "Password must be between 8 and 32 characters."
+    assert data["results"][5]["detail"] == "Malformed user entry."
+
+    stored = db_session.query(User).filter(User.email.in_(["bulk1@example.com", "bulk8@example.com"])).all()
+    assert len(stored) == 2
+    assert all(user.passhash.startswith("$bcrypt-sha256$") and not user.approved for user in stored)
+
+
+def test_bulk_registration_rejects_empty_batch(client):
+    response = client.post("/api/register/bulk", json={"users": []})
+    assert response.status_code == 422
+
+
+def test_bulk_registration_ndjson_stream(client, async_session_local, monkeypatch):
+    monkeypatch.setattr(user_registration, "SessionLocal", async_session_local)
+    monkeypatch.setattr(user_registration, "BULK_STREAM_BATCH_SIZE", 2)
+    lines = [json.dumps(_user(1)), "not json", json.dumps(_user(2, email="invalid")), json.dumps(_user(3)), json.dumps(_user(1))]
+    response = client.post("/api/register/bulk/ndjson", content="\n".join(lines) + "\n", headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [(r["index"], r["status"]) for r in results] == [
+        (0, "created"), (1, "invalid"), (2, "invalid"), (3, "created"), (4, "duplicate"),
+    ]
+
+    async def count():
+        async with async_session_local() as session:
+            return (await session.execute(select(func.count()).select_from(User))).scalar_one()
+
+    assert asyncio.run(count()) == 2
+
+
+def test_hash_many_waits_for_queue_instead_of_rejecting():
+    hasher = PasswordHasher(workers=0, max_pending=1)
+
+    async def run():
+        hasher.pending = 1  # queue full of interactive work
+
+        async def release():
+            await asyncio.sleep(0.1)
+            hasher.pending = 0
+
+        release_task = asyncio.create_task(release())
+        passhashes = await hasher.hash_many(["Password1", "Password2"])
+        await release_task
+        return passhashes
+
+    passhashes = asyncio.run(run())
+    assert len(passhashes) == 2 and all(h.startswith("$bcrypt-sha256$") for h in passhashes)
+    assert hasher.rejected == 0
+
+
+def test_hash_many_uses_at_most_half_the_pool():
+    hasher = PasswordHasher(workers=4, max_pending=64)
+    in_flight = []
+
+    async def fake_submit(operation, fn, *args):
+        hasher.pending += 1
+        in_flight.append(hasher.pending)
+        await asyncio.sleep(0.01)
+        hasher.pending -= 1
+        return "hash"
+
+    hasher._submit = fake_submit
+    assert asyncio.run(hasher.hash_many(["Password1"] * 10)) == ["hash"] * 10
+    assert max(in_flight) == 2
+
+
+def test_bulk_retry_after_conflict_reuses_hashes(async_session_local, monkeypatch):
+    from sqlalchemy.exc import IntegrityError
+
+    from ta_user_svc.models import queries
+
+    hashed = []
+    inserts = []
+
+    async def fake_hash_passwords(passwords):
+        hashed.extend(passwords)
+        return [f"hash-{p}" for p in passwords]
+
+    async def racing_insert(db, rows):
+        inserts.append([row["email"] for row in rows])
+        if len(inserts) == 1:
+            # A concurrent writer takes bulk1 between our IN check and the INSERT.
+            await queries.add_user(db, User(email="bulk1@example.com", passhash="x", nickname="racer"))
+            raise IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed"))
+        await queries.insert_users(db, rows)
+
+    monkeypatch.setattr(user_registration, "hash_passwords", fake_hash_passwords)
+    monkeypatch.setattr(user_registration, "insert_users", racing_insert)
+
+    async def run():
+        async with async_session_local() as session:
+            return await user_registration.register_batch(session, [_user(1), _user(2, password="Password2")])
+
+    results = asyncio.run(run())
+    assert [r.status for r in results] == ["duplicate", "created"]
+    assert hashed == ["Password1", "Password2"]
+    assert inserts == [["bulk1@example.com", "bulk2@example.com"], ["bulk2@example.com"]]
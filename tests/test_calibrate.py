@@ -0,0 +1,26 @@
+import pytest
+
+from ta_user_svc import calibrate
+from ta_user_svc.services.password_hasher import build_context
+
+
+def test_picks_highest_cost_within_budget(monkeypatch):
+    # Pretend every round doubles a 1 ms base cost: 2**(rounds-4) ms.
+    monkeypatch.setattr(calibrate, "time_verify", lambda context, samples: 2 ** (context.handler().default_rounds - 4) / 1000)
+    settings, elapsed = calibrate.calibrate_bcrypt("bcrypt_sha256", target=0.1, samples=1)
+    assert settings == {"BCRYPT_ROUNDS": 10}
+    assert elapsed == 0.064
+
+
+def test_context_flags_other_schemes_and_costs_for_rehash():
+    context = build_context("bcrypt_sha256", bcrypt_rounds=5)
+    current = context.hash("password123")
+    assert not context.needs_update(current)
+    assert context.needs_update(build_context("bcrypt", bcrypt_rounds=5).hash("password123"))
+    assert context.needs_update(build_context("bcrypt_sha256", bcrypt_rounds=4).hash("password123"))
+    assert context.verify("password123", build_context("bcrypt", bcrypt_rounds=4).hash("password123"))
+
+
+def test_unavailable_scheme_is_rejected():
+    with pytest.raises(ValueError):
+        build_context("md5_crypt")
@@ -0,0 +1,71 @@
+import asyncio
+import gzip
+import json
+
+from sqlalchemy import insert
+
+from ta_user_svc import export_users
+from ta_user_svc.models import base
+from ta_user_svc.models.queries import stream_users
+from ta_user_svc.models.user import User
+from ta_user_svc.services.export import EXPORT_COLUMNS, export_chunks
+
+
+def seed(session_local, count):
+    async def run():
+        async with session_local() as db:
+            await db.execute(insert(User), [
+                {"email": f"u{i}@example.com", "passhash": "h", "nickname": f"nick{i}", "role": "admin" if i == 0 else "user", "approved": i % 2 == 0}
+                for i in range(count)
+            ])
+            await db.commit()
+    asyncio.run(run())
+
+
+async def partitions(*batches):
+    for batch in batches:
+        yield batch
+
+
+async def collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_csv_has_header_and_gzip_round_trips():
+    rows = [("a@x.com", "nick", "user", True)]
+    body = asyncio.run(collect(export_chunks(partitions(rows), EXPORT_COLUMNS, "csv", compress=True)))
+    assert gzip.decompress(body).decode().splitlines() == ["email,nickname,role,approved", "a@x.com,nick,user,True"]
+
+
+def test_stream_users_yields_bounded_batches_with_filters(async_session_local):
+    seed(async_session_local, 5)
+
+    async def run(**filters):
+        async with async_session_local() as db:
+            return [[row.email for row in batch] async for batch in stream_users(db, ["email"], batch_size=2, **filters)]
+
+    assert [len(batch) for batch in asyncio.run(run())] == [2, 2, 1]
+    assert asyncio.run(run(approved=True)) == [["u0@example.com", "u2@example.com"], ["u4@example.com"]]
+    assert asyncio.run(run(role="admin", approved=True)) == [["u0@example.com"]]
+
+
+def test_stream_users_from_sync_session(db_session):
+    db_session.add(User(email="s@example.com", passhash="h", nickname="nick", approved=False))
+    db_session.commit()
+
+    async def run():
+        return [list(batch) async for batch in stream_users(db_session, ["email", "approved"])]
+
+    assert asyncio.run(run()) == [[("s@example.com", False)]]
+
+
+def test_cli_writes_gzipped_ndjson(async_session_local, tmp_path, monkeypatch):
+    seed(async_session_local, 3)
+    monkeypatch.setattr(base, "_database_url", str(async_session_local.kw["bind"].url))
+    output = tmp_path / "users.ndjson.gz"
+
+    assert export_users.main(["--gzip", "--approved", "false", "--include-passhash", "-o", str(output)]) == 0
+    lines = gzip.decompress(output.read_bytes()).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"email": "u1@example.com", "nickname": "nick1", "role": "user", "approved": False, "passhash": "h"},
+    ]
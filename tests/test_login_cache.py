@@ -0,0 +1,75 @@
+from fastapi import status
+from passlib.context import CryptContext
+
+from ta_user_svc.models.user import User
+from ta_user_svc.services.login_cache import MISSING, LoginCache, LoginRecord, login_cache
+from ta_user_svc.services.password_hasher import password_hasher
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _record(email="a@example.com"):
+    return LoginRecord(email, "hash", True, "nick")
+
+
+def test_records_are_slotted():
+    assert not hasattr(_record(), "__dict__")
+
+
+def test_negative_entries_and_eviction():
+    cache = LoginCache(maxsize=2, ttl=60, negative_ttl=60)
+    cache.put("missing@example.com", None, cache.generation)
+    assert cache.get("missing@example.com") is None
+    assert cache.get("other@example.com") is MISSING
+    cache.put("a@example.com", _record(), cache.generation)
+    cache.put("b@example.com", _record("b@example.com"), cache.generation)
+    assert cache.get("missing@example.com") is MISSING
+    assert len(cache) == 2
+
+
+def test_expired_entries_are_dropped():
+    cache = LoginCache(maxsize=10, ttl=0, negative_ttl=0)
+    cache.put("a@example.com", _record(), cache.generation)
+    assert cache.get("a@example.com") is MISSING
+
+
+def test_put_after_invalidation_is_ignored():
+    cache = LoginCache(maxsize=10, ttl=60, negative_ttl=60)
+    generation = cache.generation
+    cache.invalidate("a@example.com")  # e.g. a registration committed while we were querying
+    cache.put("a@example.com", None, generation)
+    assert cache.get("a@example.com") is MISSING
+
+
+def test_repeat_login_served_from_cache(client, db_session):
+    db_session.add(User(email="cached@example.com", passhash=pwd_context.hash("password123"), nickname="Tester", approved=True))
+    db_session.commit()
+    payload = {"email": "cached@example.com", "password": "password123"}
+    assert client.post("/api/login", json=payload).status_code == status.HTTP_200_OK
+
+    # The row is gone, but the cached record still serves the login without a query.
+    db_session.query(User).delete()
+    db_session.commit()
+    assert client.post("/api/login", json=payload).status_code == status.HTTP_200_OK
+    assert login_cache.hits == 1
+
+
+def test_unknown_email_is_negatively_cached_and_still_verifies(client, monkeypatch):
+    verified = []
+    monkeypatch.setattr(password_hasher, "observer", lambda operation, compute, queued: verified.append(operation))
+    monkeypatch.setattr(password_hasher, "_dummy_hash", None)
+    payload = {"email": "nobody@example.com", "password": "password123"}
+    for _ in range(2):
+        assert client.post("/api/login", json=payload).status_code == status.HTTP_401_UNAUTHORIZED
+    assert login_cache.get("nobody@example.com") is None
+    # The dummy hash is made once, on first use, under the current policy.
+    assert verified == ["hash", "verify", "verify"]
+    assert password_hasher._dummy_hash.startswith("$bcrypt-sha256$")
+
+
+def test_registration_invalidates_negative_entry(client):
+    assert client.post("/api/login", json={"email": "new@example.com", "password": "password123"}).status_code == 401
+    assert login_cache.get("new@example.com") is None
+    payload = {"email": "new@example.com", "password": "Password1", "nickname": "new_nick"}
+    assert client.post("/api/register", json=payload).status_code == status.HTTP_201_CREATED
+    assert login_cache.get("new@example.com") is MISSING
@@ -0,0 +1,47 @@
+import os
+
+from ta_user_svc import main as main_module
+from ta_user_svc.models import base
+from ta_user_svc.services.password_hasher import PasswordHasher
+
+
+def test_select_impl_falls_back_when_missing(monkeypatch):
+    monkeypatch.setattr(main_module.importlib.util, "find_spec", lambda name: None)
+    assert main_module.select_impl("uvloop", "asyncio") == "asyncio"
+    assert main_module.select_impl("httptools", "h11") == "h11"
+    assert main_module.select_impl("auto", "asyncio") == "auto"
+
+
+def test_hash_pool_is_shared_between_workers(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    assert main_module.hash_workers_per_process(1) == 8
+    assert main_module.hash_workers_per_process(4) == 2
+    assert main_module.hash_workers_per_process(16) == 1
+
+
+def test_main_runs_app_factory_in_workers(monkeypatch):
+    calls = {}
+    monkeypatch.setattr(main_module.uvicorn, "run", lambda app, **kwargs: calls.update(app=app, **kwargs))
+    monkeypatch.setattr(main_module, "WEB_WORKERS", 4)
+    monkeypatch.delenv("HASH_POOL_WORKERS", raising=False)
+    main_module.main()
+    assert calls["app"] == "ta_user_svc.app:create_app" and calls["factory"] is True
+    assert calls["workers"] == 4
+    assert calls["timeout_graceful_shutdown"] == main_module.GRACEFUL_SHUTDOWN_TIMEOUT
+    assert os.environ["HASH_POOL_WORKERS"] == str(main_module.hash_workers_per_process(4))
+    os.environ.pop("HASH_POOL_WORKERS")
+
+
+def test_fork_hooks_drop_inherited_resources(monkeypatch, tmp_path):
+    monkeypatch.setattr(base, "_database_url", f"sqlite:///{tmp_path / 'fork.db'}")
+    monkeypatch.setattr(base, "_engine", None)
+    engine = base.get_engine()
+    base._reset_after_fork()
+    assert base._engine is None
+    assert base.get_engine() is not engine
+    base._reset_after_fork()
+
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    hasher._executor, hasher.pending = object(), 3
+    hasher._after_fork()
+    assert hasher._executor is None and hasher.pending == 0
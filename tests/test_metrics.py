@@ -0,0 +1,47 @@
+from fastapi import status
+
+from ta_user_svc.services.metrics import HASH_SECONDS, JWT_SECONDS, RESPONSES, Counter, Histogram, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    counter = registry.register(Counter("odd_total", "Odd labels.", ("value",)))
+    counter.inc('a"b\\c')
+    assert 'odd_total{value="a\\"b\\\\c"} 1.0' in registry.render()
+
+
+def test_requests_are_recorded_by_route_template(client):
+    before = RESPONSES.value("POST", "/api/login", "401")
+    jwt_before = JWT_SECONDS.count("decode")
+    hash_before = HASH_SECONDS.count("verify")
+
+    assert client.post("/api/login", json={"email": "nobody@example.com", "password": "password123"}).status_code == 401
+    client.post("/api/refresh", json={"refresh_token": "invalid.token.value"})
+
+    assert RESPONSES.value("POST", "/api/login", "401") == before + 1
+    assert JWT_SECONDS.count("decode") == jwt_before + 1
+    assert HASH_SECONDS.count("verify") == hash_before + 1
+
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/login"}' in response.text
+    assert "# TYPE db_pool_connections gauge" in response.text
+
+
+def test_unmatched_paths_share_one_series(client):
+    client.get("/no/such/path/123")
+    assert RESPONSES.value("GET", "unmatched", "404") >= 1
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, select, text
+
+from ta_user_svc.models.user import User
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def alembic_config(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    return config, url
+
+
+def test_upgrade_backfills_and_matches_models(alembic_config):
+    config, url = alembic_config
+    command.upgrade(config, "0001")
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (email, passhash, nickname, role, approved) "
+            "VALUES (' Mixed@Example.com', 'x', 'nick', 'user', 0)"
+        ))
+
+    command.upgrade(config, "head")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT email_normalized FROM users")).scalar() == "mixed@example.com"
+        # Read sqlite_master directly: reflection skips expression indexes.
+        indexes = set(conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'users' AND sql IS NOT NULL"
+        )).scalars())
+    assert indexes == {index.name for index in User.__table__.indexes}
+    with engine.connect() as conn:
+        assert inspect(conn).has_table("audit_events")
+
+    command.downgrade(config, "base")
+    with engine.connect() as conn:
+        assert not inspect(conn).has_table("users")
+    engine.dispose()
+
+
+def query_plan(conn, statement) -> str:
+    compiled = statement.compile(conn, compile_kwargs={"literal_binds": True})
+    return " ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+
+
+def test_login_and_pending_queries_use_their_indexes(alembic_config):
+    config, url = alembic_config
+    command.upgrade(config, "head")
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        login = select(User.email, User.passhash, User.approved, User.nickname).where(User.email_normalized == "a@b.c")
+        assert "COVERING INDEX ix_users_login" in query_plan(conn, login)
+
+        pending = select(User.email).where(User.approved == False).where(User.email > "a").order_by(User.email)  # noqa: E712
+        assert "ix_users_pending" in query_plan(conn, pending)
+    engine.dispose()
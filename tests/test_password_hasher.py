@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from fastapi import status
+
+from ta_user_svc.services.password_hasher import HasherOverloadedError, PasswordHasher, password_hasher
+
+
+def test_hash_and_verify_in_process_pool():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    try:
+        passhash = asyncio.run(hasher.hash("Password1"))
+        assert passhash.startswith("$bcrypt-sha256$")
+        assert hasher.pending == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_verify_on_thread_executor():
+    from passlib.context import CryptContext
+
+    hashed = CryptContext(schemes=["bcrypt"]).hash("password123")
+    hasher = PasswordHasher(workers=0, max_pending=4)
+    assert asyncio.run(hasher.verify("password123", hashed)) is True
+    assert asyncio.run(hasher.verify("wrong", hashed)) is False
+
+
+def test_rejects_when_queue_full():
+    hasher = PasswordHasher(workers=0, max_pending=0)
+    with pytest.raises(HasherOverloadedError):
+        asyncio.run(hasher.hash("Password1"))
+    assert hasher.rejected == 1
+
+
+def test_login_returns_503_when_overloaded(client, monkeypatch, db_session):
+    from ta_user_svc.models.user import User
+
+    db_session.add(User(email="busy@example.com", passhash="x", nickname="Tester", approved=True))
+    db_session.commit()
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    response = client.post("/api/login", json={"email": "busy@example.com", "password": "password123"})
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers.get("Retry-After") == "1"
+
+
+def test_register_returns_503_when_overloaded(client, monkeypatch):
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    payload = {"email": "busy2@example.com", "password": "Password1", "nickname": "valid_nick"}
+    response = client.post("/api/register", json=payload)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+def test_recovers_from_dead_worker():
+    import os
+    import signal
+
+    hasher = PasswordHasher(workers=1, max_pending=4)
+
+    async def run():
+        await hasher.warm_up()
+        for pid in list(hasher._executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        await asyncio.sleep(0.5)
+        return await hasher.hash("Password1")
+
+    try:
+        assert asyncio.run(run()).startswith("$bcrypt-sha256$")
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,56 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from ta_user_svc.app import create_app
+from ta_user_svc.config import Settings
+from ta_user_svc.services import profiling
+from ta_user_svc.services.profiling import ProfileWriter, ProfilingMiddleware, StackAggregate
+
+
+def _app(async_session_local, query_budget=2):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, enabled=True, query_budget=query_budget)
+    profiling.instrument_engine(async_session_local.kw["bind"])
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        async with async_session_local() as db:
+            for _ in range(3):
+                await db.execute(text("SELECT 1"))
+        return {"id": item_id}
+
+    return app
+
+
+def test_query_accounting_and_budget_warning(async_session_local, caplog):
+    with TestClient(_app(async_session_local)) as client, caplog.at_level(logging.WARNING):
+        response = client.get("/items/1")
+    assert response.headers["x-query-count"] == "3"
+    assert float(response.headers["x-query-time-ms"]) > 0
+    assert "GET /items/{item_id} ran 3 SQL statements (budget 2)" in caplog.text
+
+
+def test_profile_header_writes_rotating_files(async_session_local, tmp_path, monkeypatch):
+    directory = tmp_path / "profiles"
+    monkeypatch.setattr(profiling, "profile_writer", ProfileWriter(str(directory), keep=2))
+    monkeypatch.setattr(profiling, "stack_aggregate", StackAggregate(top_n=5))
+    with TestClient(_app(async_session_local, query_budget=10)) as client:
+        client.get("/items/1")  # not profiled without the header
+        assert not directory.exists()
+        for i in range(3):
+            client.get(f"/items/{i}", headers={"X-Profile": "1"})
+
+    files = sorted(path.name for path in directory.iterdir())
+    assert len(files) == 2 and all(name.endswith("-get-items_item_id.prof") for name in files)
+    stacks = profiling.stack_aggregate.snapshot()["/items/{item_id}"]
+    assert 0 < len(stacks) <= 5
+    assert stacks[0]["samples"] == 3 and stacks[0]["stack"]
+
+
+def test_debug_view_only_mounted_when_enabled(client):
+    assert client.get("/debug/profiles").status_code == 404
+    with TestClient(create_app(Settings(profiling_enabled=True, warm_up=False))) as profiled:
+        assert profiled.get("/debug/profiles").json() == {}
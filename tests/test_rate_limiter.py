@@ -0,0 +1,79 @@
+import time
+
+from fastapi import status
+
+from ta_user_svc.services.password_hasher import password_hasher
+from ta_user_svc.services.rate_limiter import (
+    InMemoryRateLimitBackend,
+    Limit,
+    RateLimiter,
+    RateLimitExceeded,
+    SqliteRateLimitBackend,
+)
+
+LIMIT = Limit("test", rate=1, burst=2)
+
+
+def _exhaust(limiter, key="k"):
+    limiter.check((LIMIT, key))
+    limiter.check((LIMIT, key))
+    try:
+        limiter.check((LIMIT, key))
+    except RateLimitExceeded as e:
+        return e.retry_after
+    raise AssertionError("third request was not limited")
+
+
+def test_token_bucket_refills():
+    backend = InMemoryRateLimitBackend(shards=4)
+    limiter = RateLimiter(backend)
+    assert 0 < _exhaust(limiter) <= 1
+    limiter.check((LIMIT, "other"))  # keys are independent
+
+    now = time.time()
+    assert backend.take("test:k", LIMIT, now + 1.5) == 0
+    assert limiter.rejected == 1
+
+
+def test_sweep_drops_refilled_buckets():
+    backend = InMemoryRateLimitBackend(shards=4)
+    limiter = RateLimiter(backend)
+    _exhaust(limiter)
+    assert backend.sweep(time.time()) == 0
+    assert backend.sweep(time.time() + 10) == 1
+    assert len(backend) == 0
+
+
+def test_sqlite_backend_is_shared(tmp_path):
+    path = str(tmp_path / "limits.db")
+    first = RateLimiter(SqliteRateLimitBackend(path))
+    second = RateLimiter(SqliteRateLimitBackend(path))  # e.g. another worker process
+    first.check((LIMIT, "k"))
+    first.check((LIMIT, "k"))
+    try:
+        second.check((LIMIT, "k"))
+    except RateLimitExceeded:
+        pass
+    else:
+        raise AssertionError("second limiter did not see the shared bucket")
+    assert second.backend.sweep(time.time() + 10) == 1
+
+
+def test_login_limited_before_bcrypt(client, monkeypatch):
+    monkeypatch.setattr("ta_user_svc.routers.user_login.LOGIN_PER_EMAIL", LIMIT)
+    verified = []
+    monkeypatch.setattr(password_hasher, "observer", lambda operation, compute, queued: verified.append(operation))
+
+    payload = {"email": "target@example.com", "password": "password123"}
+    codes = [client.post("/api/login", json=payload).status_code for _ in range(3)]
+    assert codes == [status.HTTP_401_UNAUTHORIZED, status.HTTP_401_UNAUTHORIZED, status.HTTP_429_TOO_MANY_REQUESTS]
+    assert len(verified) == 2
+
+    response = client.post("/api/login", json=payload)
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_refresh_limited_per_ip(client, monkeypatch):
+    monkeypatch.setattr("ta_user_svc.routers.user_refresh.REFRESH_PER_IP", LIMIT)
+    codes = [client.post("/api/refresh", json={"refresh_token": "invalid.token.value"}).status_code for _ in range(3)]
+    assert codes[-1] == status.HTTP_429_TOO_MANY_REQUESTS
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from ta_user_svc.app import create_app
+from ta_user_svc.config import Settings
+from ta_user_svc.models import base
+from ta_user_svc.models.base import Base, ReadRouter, read_router
+from ta_user_svc.models.user import User
+
+pwd_context = CryptContext(schemes=["bcrypt_sha256"], deprecated="auto")
+PASSWORD = "password123"
+
+
+def make_db(path, *emails):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add_all([User(email=email, passhash=pwd_context.hash(PASSWORD), nickname="nick", approved=True) for email in emails])
+        session.commit()
+    engine.dispose()
+    return f"sqlite:///{path}"
+
+
+@pytest.fixture
+def restore_engine_config(monkeypatch):
+    monkeypatch.setattr(base, "_database_url", base._database_url)
+    monkeypatch.setattr(base, "_replica_urls", base._replica_urls)
+    yield
+    read_router.clear()
+
+
+def login(client, email):
+    return client.post("/api/login", json={"email": email, "password": PASSWORD})
+
+
+def test_pick_round_robins_over_healthy_replicas():
+    router = ReadRouter(pin_seconds=5)
+    router.set_engines(["r1", "r2", "r3"])
+    assert {router.pick() for _ in range(3)} == {"r1", "r2", "r3"}
+    router.healthy = [False, True, False]
+    assert {router.pick() for _ in range(3)} == {"r2"}
+    router.healthy = [False, False, False]
+    assert router.pick() is None
+
+
+def test_pins_expire():
+    router = ReadRouter(pin_seconds=0.05)
+    router.pin("10.0.0.1")
+    assert not router.pinned("10.0.0.1")  # nothing to pin away from without replicas
+    router.set_engines(["r1"])
+    router.pin("10.0.0.1")
+    assert router.pinned("10.0.0.1") and not router.pinned("10.0.0.2")
+    time.sleep(0.06)
+    assert not router.pinned("10.0.0.1")
+
+
+def test_health_check_marks_replicas(tmp_path):
+    router = ReadRouter(pin_seconds=5)
+
+    async def run():
+        good = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'good.db'}")
+        bad = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'bad.db'}")
+        router.set_engines([good, bad])
+        await router.check(timeout=1)
+        router.healthy[1] = True
+        await router.check(timeout=1)
+        for engine in (good, bad):
+            await engine.dispose()
+
+    asyncio.run(run())
+    assert router.healthy == [True, False]
+
+
+def test_reads_go_to_replicas_and_writers_read_their_writes(tmp_path, restore_engine_config):
+    primary = make_db(tmp_path / "primary.db", "everywhere@example.com", "primary-only@example.com")
+    replicas = (make_db(tmp_path / "r1.db", "everywhere@example.com"), make_db(tmp_path / "r2.db", "everywhere@example.com"))
+    app = create_app(Settings(database_url=primary, replica_urls=replicas, warm_up=False))
+
+    with TestClient(app) as client:
+        assert login(client, "everywhere@example.com").status_code == status.HTTP_200_OK
+        # Not replicated yet, and this client has not written: the replica answers.
+        assert login(client, "primary-only@example.com").status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = client.post("/api/register", json={"email": "new@example.com", "password": PASSWORD, "nickname": "newbie"})
+        assert response.status_code == status.HTTP_201_CREATED
+        # Pinned to the primary after the write, so the new account is visible at once.
+        assert login(client, "new@example.com").status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_failed_replica_falls_back_to_primary(tmp_path, restore_engine_config):
+    primary = make_db(tmp_path / "primary.db", "user@example.com")
+    broken = f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    app = create_app(Settings(database_url=primary, replica_urls=(broken,), warm_up=False))
+
+    with TestClient(app) as client:
+        assert login(client, "user@example.com").status_code == status.HTTP_200_OK
+        assert read_router.healthy == [False]
+        assert login(client, "user@example.com").status_code == status.HTTP_200_OK
@@ -0,0 +1,69 @@
+import time
+
+from fastapi import status
+from passlib.context import CryptContext
+
+from ta_user_svc.models.user import User
+from ta_user_svc.services.revocation import RevocationStore, SqliteRevocationBackend, revocation_store
+from ta_user_svc.services.tokens import decode_token
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _login(client, db_session):
+    db_session.add(User(email="out@example.com", passhash=pwd_context.hash("password123"), nickname="Tester", approved=True))
+    db_session.commit()
+    response = client.post("/api/login", json={"email": "out@example.com", "password": "password123"})
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def test_expired_buckets_are_swept():
+    store = RevocationStore(bucket_seconds=1)
+    now = time.time()
+    store.revoke("live", now + 3600)
+    store.revoke("short", now + 0.5)
+    store.revoke("stale", now - 1)  # already expired: never stored
+    assert store.is_revoked("live") and store.is_revoked("short")
+    assert not store.is_revoked("stale")
+
+    store.sweep(now + 3)
+    assert not store.is_revoked("short")
+    assert store.is_revoked("live")
+    assert len(store) == 1
+
+
+def test_sqlite_backend_survives_restart(tmp_path):
+    path = str(tmp_path / "revoked.db")
+    store = RevocationStore(60, SqliteRevocationBackend(path))
+    store.revoke("abc", time.time() + 600)
+    store.backend.close()
+
+    restarted = RevocationStore(60, SqliteRevocationBackend(path))
+    assert not restarted.is_revoked("abc")
+    restarted.load()
+    assert restarted.is_revoked("abc")
+    restarted.backend.close()
+
+
+def test_logout_revokes_access_and_refresh_tokens(client, db_session):
+    tokens = _login(client, db_session)
+    assert client.post("/api/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == status.HTTP_200_OK
+
+    response = client.get(
+        "/api/logout",
+        headers={"Authorization": f"Bearer {tokens['access_token']}", "X-Refresh-Token": tokens["refresh_token"]},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert revocation_store.is_revoked(decode_token(tokens["access_token"])["jti"])
+
+    # Still in the verified-claims cache, but the revocation check runs on every call.
+    response = client.post("/api/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json()["detail"] == "Refresh token revoked"
+
+
+def test_logout_rejects_invalid_token(client):
+    response = client.get("/api/logout", headers={"Authorization": "Bearer not.a.token"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert len(revocation_store) == 0
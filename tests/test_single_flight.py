@@ -0,0 +1,151 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import status
+from passlib.context import CryptContext
+from sqlalchemy import func, select
+
+from ta_user_svc.app import app
+from ta_user_svc.models.base import get_db
+from ta_user_svc.models.queries import insert_user_if_absent
+from ta_user_svc.models.user import User
+from ta_user_svc.routers import user_login, user_registration
+from ta_user_svc.services.single_flight import SingleFlight, credentials_key, login_flight, registration_flight
+
+pwd_context = CryptContext(schemes=["bcrypt_sha256"], deprecated="auto")
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def run():
+        return await asyncio.gather(
+            flight.do("a", lambda: work(1)), flight.do("a", lambda: work(2)), flight.do("b", lambda: work(3)),
+        )
+
+    assert asyncio.run(run()) == [(1, False), (1, True), (3, False)]
+    assert calls == [1, 3]
+    assert (flight.executed, flight.coalesced, len(flight)) == (2, 1, 0)
+
+
+def test_errors_reach_every_caller_and_the_key_is_released():
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(flight.do("a", fail), flight.do("a", fail), return_exceptions=True)
+
+    assert [type(result) for result in asyncio.run(run())] == [ValueError, ValueError]
+    assert len(flight) == 0
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        leader = asyncio.create_task(flight.do("a", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("a", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == ("done", True)
+
+
+def test_credentials_key_depends_on_both_fields():
+    assert credentials_key("a@x.com", "pw") == credentials_key("a@x.com", "pw")
+    assert credentials_key("a@x.com", "pw") != credentials_key("a@x.com", "pw2")
+    assert credentials_key("a@x.com", "pw") != credentials_key("b@x.com", "pw")
+
+
+def test_insert_user_if_absent_reports_conflicts(async_session_local):
+    async def run():
+        async with async_session_local() as db:
+            values = {"email": "Dup@example.com", "passhash": "x", "nickname": "first", "role": "user", "approved": False}
+            first = await insert_user_if_absent(db, values)
+            second = await insert_user_if_absent(db, {**values, "email": "dup@example.com"})
+            count = await db.scalar(select(func.count()).select_from(User))
+        return first, second, count
+
+    assert asyncio.run(run()) == (True, False, 1)
+
+
+@pytest.fixture
+def asgi_client(async_session_local):
+    async def override_session():
+        async with async_session_local() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_session
+    yield lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides.pop(get_db, None)
+
+
+def test_identical_logins_share_one_verify(asgi_client, async_session_local, monkeypatch):
+    async def seed():
+        async with async_session_local() as db:
+            db.add(User(email="retry@example.com", passhash=pwd_context.hash("password123"), nickname="Tester", approved=True))
+            await db.commit()
+
+    verifies = []
+    verify_password = user_login.verify_password
+
+    async def counting_verify(password, passhash):
+        verifies.append(password)
+        await asyncio.sleep(0.05)  # keep the first call in flight while the copies arrive
+        return await verify_password(password, passhash)
+
+    monkeypatch.setattr(user_login, "verify_password", counting_verify)
+    asyncio.run(seed())
+    coalesced = login_flight.coalesced
+
+    async def run():
+        async with asgi_client() as client:
+            body = {"email": "retry@example.com", "password": "password123"}
+            return await asyncio.gather(*(client.post("/api/login", json=body) for _ in range(5)))
+
+    responses = asyncio.run(run())
+    assert [response.status_code for response in responses] == [status.HTTP_200_OK] * 5
+    assert len({response.json()["access_token"] for response in responses}) == 5
+    assert len(verifies) == 1
+    assert login_flight.coalesced - coalesced == 4
+
+
+def test_duplicate_registrations_create_one_account(asgi_client, async_session_local, monkeypatch):
+    hashes = []
+    hash_password = user_registration.hash_password
+
+    async def counting_hash(password):
+        hashes.append(password)
+        return await hash_password(password)
+
+    monkeypatch.setattr(user_registration, "hash_password", counting_hash)
+    coalesced = registration_flight.coalesced
+
+    async def run():
+        async with asgi_client() as client:
+            body = {"email": "twice@example.com", "password": "Password1", "nickname": "twice"}
+            responses = await asyncio.gather(*(client.post("/api/register", json=body) for _ in range(4)))
+        async with async_session_local() as db:
+            count = await db.scalar(select(func.count()).select_from(User))
+        return responses, count
+
+    responses, count = asyncio.run(run())
+    assert sorted(response.status_code for response in responses) == [201, 409, 409, 409]
+    assert count == 1 and len(hashes) == 1
+    assert registration_flight.coalesced - coalesced == 3
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from ta_user_svc.app import create_app
+from ta_user_svc.config import Settings
+from ta_user_svc.models import base
+from ta_user_svc.models.base import Base, read_router, sqlite_engine
+from ta_user_svc.models.user import User
+from ta_user_svc.services.user_writer import GroupCommitWriter
+
+pwd_context = CryptContext(schemes=["bcrypt_sha256"], deprecated="auto")
+PASSWORD = "password123"
+
+
+def make_db(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add(User(email="existing@example.com", passhash=pwd_context.hash(PASSWORD), nickname="nick", approved=True))
+        session.commit()
+    engine.dispose()
+    return f"sqlite:///{path}"
+
+
+@pytest.fixture
+def restore_engine_config(monkeypatch):
+    monkeypatch.setattr(base, "_database_url", base._database_url)
+    monkeypatch.setattr(base, "_replica_urls", base._replica_urls)
+    monkeypatch.setattr(base, "_sqlite_tuned", base._sqlite_tuned)
+    yield
+    read_router.clear()
+
+
+def user(email):
+    return {"email": email, "passhash": "h", "nickname": "nick", "role": "user", "approved": False}
+
+
+def test_engines_apply_pragmas_and_writer_has_one_connection(tmp_path):
+    url = make_db(tmp_path / "users.db")
+
+    async def run():
+        writer, reader = sqlite_engine(url, writer=True), sqlite_engine(url, writer=False)
+        try:
+            async with reader.connect() as conn:
+                journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+                busy_timeout = (await conn.execute(text("PRAGMA busy_timeout"))).scalar()
+            return journal_mode, busy_timeout, writer.pool.size(), reader.pool.size()
+        finally:
+            await writer.dispose()
+            await reader.dispose()
+
+    journal_mode, busy_timeout, writer_size, reader_size = asyncio.run(run())
+    assert journal_mode == "wal"
+    assert busy_timeout == 5000
+    assert writer_size == 1 and reader_size > 1
+
+
+def test_group_commit_writer_batches_and_reports_conflicts(tmp_path):
+    url = make_db(tmp_path / "users.db")
+    writer = GroupCommitWriter(max_batch=8)
+
+    async def run():
+        engine = sqlite_engine(url, writer=True)
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        task = asyncio.create_task(writer.run(session_factory))
+        await asyncio.sleep(0)
+        emails = [f"u{i}@example.com" for i in range(20)] + ["EXISTING@example.com", "u0@example.com"]
+        results = await asyncio.gather(*(writer.insert_user(user(email)) for email in emails))
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        async with session_factory() as db:
+            count = (await db.execute(select(func.count()).select_from(User))).scalar()
+        await engine.dispose()
+        return results, count
+
+    results, count = asyncio.run(run())
+    assert results == [True] * 20 + [False, False]
+    assert count == 21
+    assert writer.rows == 22 and writer.batches == 3
+    assert not writer.running
+
+
+def test_app_registers_and_logs_in_on_tuned_sqlite(tmp_path, restore_engine_config):
+    app = create_app(Settings(database_url=make_db(tmp_path / "users.db"), replica_urls=(), sqlite_tuned=True, warm_up=False))
+
+    with TestClient(app) as client:
+        assert base.sqlite_mode() and read_router.consistent
+        assert client.post("/api/login", json={"email": "existing@example.com", "password": PASSWORD}).status_code == status.HTTP_200_OK
+
+        body = {"email": "new@example.com", "password": PASSWORD, "nickname": "newbie"}
+        assert client.post("/api/register", json=body).status_code == status.HTTP_201_CREATED
+        assert client.post("/api/register", json=body).status_code == status.HTTP_409_CONFLICT
+        # The reader pool sees the writer's commit at once; approval is still pending.
+        response = client.post("/api/login", json={"email": "new@example.com", "password": PASSWORD})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert not base.sqlite_mode()
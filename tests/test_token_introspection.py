@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+from fastapi import status
+from sqlalchemy import event
+
+from ta_user_svc.models.user import User
+from ta_user_svc.services.introspection import UserStatusBatcher
+from ta_user_svc.services.revocation import revocation_store
+from ta_user_svc.services.tokens import encode_token
+
+
+def token(sub, exp_in=60, jti=None):
+    return encode_token({"sub": sub, "nickname": "nick", "jti": jti or f"jti-{sub}-{exp_in}", "exp": int(time.time()) + exp_in})
+
+
+def add_users(db_session):
+    db_session.add_all([
+        User(email="Active@example.com", passhash="h", nickname="nick", role="admin", approved=True),
+        User(email="pending@example.com", passhash="h", nickname="nick", approved=False),
+    ])
+    db_session.commit()
+
+
+def test_introspect_reports_each_token(client, db_session):
+    add_users(db_session)
+    revoked = token("active@example.com", jti="revoked-jti")
+    revocation_store.revoke("revoked-jti", time.time() + 60)
+    tokens = [
+        token("active@example.com"),
+        token("pending@example.com"),
+        token("gone@example.com"),
+        token("active@example.com", exp_in=-60),
+        revoked,
+        "not-a-token",
+        token("active@example.com"),
+    ]
+
+    response = client.post("/api/tokens/introspect", json={"tokens": tokens})
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert [(r["active"], r["reason"]) for r in results] == [
+        (True, None),
+        (False, "not_approved"),
+        (False, "unknown_user"),
+        (False, "expired"),
+        (False, "revoked"),
+        (False, "invalid"),
+        (True, None),
+    ]
+    assert results[0]["role"] == "admin"
+    assert results[0]["claims"]["sub"] == "active@example.com"
+
+
+def test_introspect_uses_one_user_query(client, db_session, session_local):
+    add_users(db_session)
+    engine = session_local.kw["bind"]
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        tokens = [token("active@example.com", exp_in=60 + i) for i in range(20)] + [token("pending@example.com")]
+        response = client.post("/api/tokens/introspect", json={"tokens": tokens})
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(statements) == 1 and " IN " in statements[0]
+
+
+def test_introspect_rejects_empty_batch(client):
+    response = client.post("/api/tokens/introspect", json={"tokens": []})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_concurrent_lookups_share_one_query(async_session_local):
+    batcher = UserStatusBatcher(window=0.01, max_emails=100)
+
+    async def run():
+        async with async_session_local() as db:
+            db.add(User(email="a@example.com", passhash="h", nickname="nick", approved=True))
+            await db.commit()
+        async with async_session_local() as first, async_session_local() as second:
+            return await asyncio.gather(
+                batcher.lookup(first, {"a@example.com"}),
+                batcher.lookup(second, {"a@example.com", "b@example.com"}),
+            )
+
+    first, second = asyncio.run(run())
+    assert first == second == {"a@example.com": (True, "user")}
+    assert (batcher.queries, batcher.lookups) == (1, 2)
@@ -0,0 +1,121 @@
+import time
+
+import jwt
+from fastapi import status
+
+from ta_user_svc.config import JWT_SECRET
+from ta_user_svc.services.tokens import VerifiedTokenCache, decode_token, encode_token, token_cache
+
+
+def test_encoded_tokens_verify_with_raw_secret():
+    token = encode_token({"sub": "a@example.com", "exp": int(time.time()) + 60})
+    assert jwt.decode(token, JWT_SECRET, algorithms=["HS256"])["sub"] == "a@example.com"
+    assert decode_token(token)["sub"] == "a@example.com"
+
+
+def test_cache_hit_and_miss_counters():
+    cache = VerifiedTokenCache(maxsize=10, ttl=60)
+    assert cache.get("token") is None
+    cache.put("token", {"sub": "a@example.com", "exp": time.time() + 60})
+    assert cache.get("token")["sub"] == "a@example.com"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_entry_never_outlives_exp():
+    cache = VerifiedTokenCache(maxsize=10, ttl=3600)
+    cache.put("token", {"sub": "a@example.com", "exp": time.time() - 1})
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = VerifiedTokenCache(maxsize=2, ttl=60)
+    cache.put("a", {"sub": "a"})
+    cache.put("b", {"sub": "b"})
+    cache.get("a")
+    cache.put("c", {"sub": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_repeat_refresh_served_from_cache(client):
+    token_cache.clear()
+    refresh_token = encode_token({"sub": "r@example.com", "nickname": "repeat", "exp": int(time.time()) + 600})
+    for _ in range(3):
+        response = client.post("/api/refresh", json={"refresh_token": refresh_token})
+        assert response.status_code == status.HTTP_200_OK
+    assert token_cache.misses == 1
+    assert token_cache.hits == 2
+
+
+def _ring(tmp_path, active, **keys):
+    from ta_user_svc.keygen import generate_key, write_key
+    from ta_user_svc.services.tokens import KeyRing
+
+    for kid, algorithm in keys.items():
+        if not (tmp_path / f"{kid}.pem").exists():
+            write_key(str(tmp_path), kid, generate_key(algorithm))
+    return KeyRing.load(keys[active], JWT_SECRET, str(tmp_path), active, accept_hs256=True)
+
+
+def test_asymmetric_tokens_carry_kid_and_survive_rotation(tmp_path, monkeypatch):
+    from ta_user_svc.services import tokens
+
+    monkeypatch.setattr(tokens, "key_ring", _ring(tmp_path, "old", old="ES256"))
+    old_token = encode_token({"sub": "a@example.com", "exp": int(time.time()) + 60})
+    assert jwt.get_unverified_header(old_token) == {"alg": "ES256", "kid": "old", "typ": "JWT"}
+
+    # Rotate: add an EdDSA key and make it active; the ES256 key still verifies.
+    monkeypatch.setattr(tokens, "key_ring", _ring(tmp_path, "new", new="EdDSA", old="ES256"))
+    new_token = encode_token({"sub": "b@example.com", "exp": int(time.time()) + 60})
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert jwt.decode(new_token, tokens.key_ring.verification_keys["new"][0], algorithms=["EdDSA"])["sub"] == "b@example.com"
+    assert decode_token(old_token)["sub"] == "a@example.com"
+    assert decode_token(new_token)["sub"] == "b@example.com"
+
+    # Legacy HS256 tokens still verify during the migration; forged kids don't.
+    assert decode_token(jwt.encode({"sub": "c@example.com"}, JWT_SECRET, algorithm="HS256"))["sub"] == "c@example.com"
+    forged = jwt.encode({"sub": "x"}, JWT_SECRET, algorithm="HS256", headers={"kid": "new"})
+    try:
+        decode_token(forged)
+    except jwt.InvalidTokenError:
+        pass
+    else:
+        raise AssertionError("HS256 token accepted under an asymmetric kid")
+
+
+def test_jwks_endpoint_is_cacheable(client, tmp_path, monkeypatch):
+    from ta_user_svc.services import tokens
+
+    monkeypatch.setattr(tokens, "key_ring", _ring(tmp_path, "k1", k1="EdDSA"))
+    response = client.get("/.well-known/jwks.json")
+    assert response.status_code == status.HTTP_200_OK
+    assert "max-age=" in response.headers["cache-control"]
+    (key,) = response.json()["keys"]
+    assert key["kid"] == "k1" and key["alg"] == "EdDSA" and "d" not in key
+
+    # A consumer verifies locally with the published key.
+    token = encode_token({"sub": "a@example.com", "exp": int(time.time()) + 60})
+    public_key = jwt.PyJWK.from_dict(key)
+    assert jwt.decode(token, public_key, algorithms=["EdDSA"])["sub"] == "a@example.com"
+
+    revalidated = client.get("/.well-known/jwks.json", headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+    assert revalidated.content == b""
+
+
+def test_prebuilt_header_tokens_match_pyjwt():
+    from ta_user_svc.services.tokens import key_ring
+
+    payload = {"sub": "a@example.com", "nickname": "nick", "jti": "abc", "exp": int(time.time()) + 60}
+    expected = jwt.encode(payload, key_ring.signing_key, algorithm=key_ring.algorithm, headers=key_ring.headers)
+    assert encode_token(payload) == expected
+
+
+def test_fast_response_path_uses_less_cpu_and_memory():
+    from benchmarks.response_path import measure
+
+    results = measure(iterations=300)
+    assert results["fast"]["us_per_request"] < results["legacy"]["us_per_request"]
+    assert results["fast"]["peak_bytes"] < results["legacy"]["peak_bytes"]
@@ -70,3 +70,55 @@ def test_missing_fields(client):
     # Missing password field should trigger validation error (422)
     response = client.post("/api/login", json={"email": "test@example.com"})
     assert response.status_code == 422
+
+
+def test_outdated_hash_is_upgraded_after_login(async_session_local, monkeypatch):
+    import asyncio
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import select
+
+    from ta_user_svc.app import app
+    from ta_user_svc.models.base import get_db
+    from ta_user_svc.routers import user_login
+    from ta_user_svc.services.password_hasher import needs_rehash
+
+    async def seed():
+        async with async_session_local() as session:
+            # Plain bcrypt: still accepted, but not the current policy.
+            session.add(User(email="old@example.com", passhash=pwd_context.hash("password123"), nickname="Tester", approved=True))
+            await session.commit()
+
+    async def stored_hash():
+        async with async_session_local() as session:
+            return (await session.execute(select(User.passhash).where(User.email == "old@example.com"))).scalar_one()
+
+    async def override_session():
+        async with async_session_local() as session:
+            yield session
+
+    asyncio.run(seed())
+    monkeypatch.setattr(user_login, "SessionLocal", async_session_local)
+    app.dependency_overrides[get_db] = override_session
+    try:
+        with TestClient(app) as client:
+            payload = {"email": "old@example.com", "password": "password123"}
+            assert client.post("/api/login", json=payload).status_code == status.HTTP_200_OK
+            upgraded = asyncio.run(stored_hash())
+            assert upgraded.startswith("$bcrypt-sha256$") and not needs_rehash(upgraded)
+            # The new hash verifies, and the stale cached record was dropped.
+            assert client.post("/api/login", json=payload).status_code == status.HTTP_200_OK
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+def test_login_email_is_case_insensitive(client, db_session):
+    password = "password123"
+    user = User(email="Mixed@Example.com", passhash=pwd_context.hash(password), nickname="Tester", approved=True)
+    db_session.add(user)
+    db_session.commit()
+
+    response = client.post("/api/login", json={"email": "mixed@EXAMPLE.com", "password": password})
+    assert response.status_code == status.HTTP_200_OK
+    access_payload = jwt.decode(response.json()["access_token"], JWT_SECRET, algorithms=["HS256"])
+    assert access_payload.get("sub") == "Mixed@Example.com"
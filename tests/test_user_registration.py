@@ -39,6 +39,14 @@ def test_duplicate_email(client, db_session):
         del client.app.dependency_overrides[get_db]
 
 
+def test_duplicate_email_differs_only_in_case(client):
+    payload = {"email": "Case@Example.com", "password": "Password1", "nickname": "nick1"}
+    assert client.post("/api/register", json=payload).status_code == 201
+    payload["email"] = "case@example.COM"
+    response = client.post("/api/register", json=payload)
+    assert response.status_code == 409, response.text
+
+
 def test_invalid_email(client):
     payload = {
         "email": "invalid-email",